@@ -0,0 +1,48 @@
+
+"""Throughput of deliver_reports against an in-process SMTP sink.
+
+    python benchmarks/bench_delivery.py --students 3000 --workers 8
+
+The sink accepts and discards every message, so the figure is the cost of
+building, sending and logging messages over pooled connections, not of a real MTA.
+"""
+from __future__ import annotations
+import argparse, os, sys, tempfile, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gradebook_manager.delivery import SMTPSettings, deliver_reports
+from gradebook_manager.gradebook import Gradebook
+from gradebook_manager.models import Student
+from tests.smtp_sink import SMTPSink
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--students", type=int, default=3000)
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    sink = SMTPSink().start()
+    settings = SMTPSettings(host="127.0.0.1", port=sink.port)
+    with tempfile.TemporaryDirectory() as tmp:
+        gb = Gradebook(); reports = {}
+        for i in range(args.students):
+            sid = f"S{i:06d}"
+            gb.add_student(Student(sid, "First", f"Last{i}", f"{sid.lower()}@example.edu"))
+            path = os.path.join(tmp, f"{sid}_report.csv")
+            with open(path, "w", encoding="utf-8") as f: f.write(f"student_id,score\n{sid},{i % 100}\n")
+            reports[sid] = [path]
+        status = os.path.join(tmp, "delivery.csv")
+
+        t0 = time.perf_counter()
+        res = deliver_reports(gb, reports, settings, status, workers=args.workers)
+        dt = time.perf_counter() - t0
+        sent = sum(1 for r in res.values() if r.status == "sent")
+        print(f"sent {sent}/{args.students} in {dt:.2f}s: {sent / dt:.0f} msg/s "
+              f"({args.workers} workers, sink received {sink.count})")
+
+        t0 = time.perf_counter()
+        res = deliver_reports(gb, reports, settings, status, workers=args.workers)
+        print(f"resume with unchanged reports: {len(res)} re-sent in {time.perf_counter() - t0:.2f}s")
+    sink.shutdown(); sink.server_close()
+
+if __name__ == "__main__":
+    main()
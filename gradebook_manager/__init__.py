@@ -1,2 +1,2 @@
-__all__ = ['app','exceptions','gradebook','models','reports','storage','ui','auth']
+__all__ = ['app','exceptions','gradebook','models','reports','storage','ui','auth','profiling','history','delivery','search','streaming','transcripts']
 __version__='0.2.0'
@@ -1,13 +1,20 @@
 
 from __future__ import annotations
 import argparse, os, tkinter as tk
+from datetime import datetime
 from .gradebook import Gradebook
-from .storage import load_students_csv, load_assignments_csv, load_grades_csv
-from .reports import export_all_students_csv
+from .storage import load_students_csv, load_assignments_csv, load_grades_csv, load_categories_csv
+from .reports import export_all_students_csv, export_all_students_pdf
 from .ui import GradebookApp
+from .history import GradeHistory
+from .exceptions import GradebookError
+from .delivery import SMTPSettings, collect_report_paths, deliver_reports
+from .streaming import stream_gradebook
 from .auth import login_flow
+from . import profiling
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+HISTORY_DIR = os.path.join(DATA_DIR, "history")
 
 def load_sample_data(gb: Gradebook):
     # Sample seed
@@ -19,6 +26,7 @@ def load_sample_data(gb: Gradebook):
     students_live = os.path.join(DATA_DIR, "students.csv")
     assignments_live = os.path.join(DATA_DIR, "assignments.csv")
     grades_live = os.path.join(DATA_DIR, "grades.csv")
+    categories_live = os.path.join(DATA_DIR, "categories.csv")
 
     def _merge_students(path):
         if os.path.exists(path):
@@ -41,20 +49,100 @@ def load_sample_data(gb: Gradebook):
     # Load samples first, then live files (live overwrites/extends)
     _merge_students(students_p); _merge_assignments(assignments_p); _merge_grades(grades_p)
     _merge_students(students_live); _merge_assignments(assignments_live); _merge_grades(grades_live)
+    # Optional category weights / drop rules; without the file grading stays per-assignment
+    if os.path.exists(categories_live):
+        for c in load_categories_csv(categories_live):
+            gb.set_category(c)
+
+def load_course_definitions(gb: Gradebook):
+    """Assignments and categories only (sample, then live), for streaming mode."""
+    for path in (os.path.join(DATA_DIR, "sample_assignments.csv"), os.path.join(DATA_DIR, "assignments.csv")):
+        if os.path.exists(path):
+            for a in load_assignments_csv(path):
+                try: gb.add_assignment(a)
+                except Exception: pass
+    categories_live = os.path.join(DATA_DIR, "categories.csv")
+    if os.path.exists(categories_live):
+        for c in load_categories_csv(categories_live):
+            gb.set_category(c)
+
+def run_streaming(args):
+    gb = Gradebook(strict_weights=args.strict_weights)
+    load_course_definitions(gb)
+    students_p = args.stream_students or os.path.join(DATA_DIR, "students.csv")
+    report_dir = None; fmt = "csv"
+    if args.export_all_csv: report_dir = os.path.join(os.getcwd(), "reports_csv")
+    elif args.export_all_pdf: report_dir = os.path.join(os.getcwd(), "reports_pdf"); fmt = "pdf"
+    summary_p = os.path.join(os.getcwd(), "stream_summary.csv")
+    res = stream_gradebook(gb, students_p, args.stream_grades, summary_csv=summary_p,
+                           report_dir=report_dir, report_format=fmt, chunk_rows=args.chunk_rows)
+    print(f"Students: {res.students}   Class Avg: {res.class_average:.2f}%   "
+          f"Skipped rows: {res.skipped_rows}   Spill files: {res.spill_files}")
+    for aid, st in res.assignment_stats.items():
+        lo = "-" if st.min is None else f"{st.min:g}"; hi = "-" if st.max is None else f"{st.max:g}"
+        print(f"  {aid}: n={st.count} mean={st.mean:.2f} min={lo} max={hi}")
+    print(f"Per-student results: {summary_p}")
+    if report_dir: print(f"Reports exported to: {report_dir}")
 
 def main():
     ap = argparse.ArgumentParser(description="Student Gradebook Manager")
     ap.add_argument("--export-all-csv", action="store_true", help="Export CSV reports for all students and exit")
+    ap.add_argument("--export-all-pdf", action="store_true", help="Export PDF reports for all students and exit")
+    ap.add_argument("--incremental", action="store_true", help="With --export-all-*: only re-render reports whose inputs changed")
+    ap.add_argument("--email-reports", action="store_true", help="With --export-all-*: email each student their exported reports")
+    ap.add_argument("--smtp-host", default="localhost", help="SMTP server for --email-reports")
+    ap.add_argument("--smtp-port", type=int, default=25, help="SMTP port for --email-reports")
+    ap.add_argument("--smtp-sender", default="gradebook@localhost", help="From address for --email-reports")
+    ap.add_argument("--email-workers", type=int, default=4, help="Concurrent senders / pooled SMTP connections")
     ap.add_argument("--strict-weights", action="store_true", help="Require weights to sum to 1.0 (no normalization)")
+    ap.add_argument("--as-of", default=None, help="With --export-all-*: export grades as they were at this ISO date/time")
+    ap.add_argument("--stream-grades", default=None, help="Process this grades CSV out-of-core (bounded memory) and exit")
+    ap.add_argument("--stream-students", default=None, help="Roster CSV for --stream-grades (default: data/students.csv)")
+    ap.add_argument("--chunk-rows", type=int, default=200_000, help="Rows sorted in memory per spill file in streaming mode")
+    ap.add_argument("--profile", action="store_true", help="Record call counts/latency and write a JSON report at exit")
+    ap.add_argument("--profile-out", default="gradebook_profile.json", help="JSON report path for --profile")
+    ap.add_argument("--profile-pstats", default=None, help="Also run cProfile and dump pstats to this path")
     args = ap.parse_args()
 
+    if args.profile:
+        profiling.enable(json_path=args.profile_out, pstats_path=args.profile_pstats)
+    else:
+        profiling.enable_from_env()
+
+    if args.stream_grades:
+        unsupported = [flag for flag, on in (("--incremental", args.incremental), ("--email-reports", args.email_reports),
+                                             ("--as-of", args.as_of is not None)) if on]
+        if unsupported:
+            ap.error(f"--stream-grades cannot be combined with {', '.join(unsupported)}")
+        if args.export_all_csv and args.export_all_pdf:
+            ap.error("--stream-grades writes one report format; pass --export-all-csv or --export-all-pdf, not both")
+        run_streaming(args); return
+
     gb = Gradebook(strict_weights=args.strict_weights)
     load_sample_data(gb)
+    gb.history = GradeHistory.open(HISTORY_DIR, gb.grades)
 
-    if args.export_all_csv:
-        out_dir = os.path.join(os.getcwd(), "reports_csv")
-        export_all_students_csv(gb, out_dir)
-        print(f"CSV reports exported to: {out_dir}")
+    if args.export_all_csv or args.export_all_pdf:
+        try:
+            src = gb.as_of(datetime.fromisoformat(args.as_of).timestamp()) if args.as_of else gb
+        except (ValueError, GradebookError) as e:
+            ap.error(f"--as-of: {e}")
+        out_dirs = []
+        if args.export_all_csv:
+            out_dir = os.path.join(os.getcwd(), "reports_csv")
+            export_all_students_csv(src, out_dir, incremental=args.incremental)
+            print(f"CSV reports exported to: {out_dir}"); out_dirs.append(out_dir)
+        if args.export_all_pdf:
+            out_dir = os.path.join(os.getcwd(), "reports_pdf")
+            export_all_students_pdf(src, out_dir, incremental=args.incremental)
+            print(f"PDF reports exported to: {out_dir}"); out_dirs.append(out_dir)
+        if args.email_reports:
+            settings = SMTPSettings(host=args.smtp_host, port=args.smtp_port, sender=args.smtp_sender)
+            status_path = os.path.join(os.getcwd(), "reports_delivery.csv")
+            results = deliver_reports(src, collect_report_paths(out_dirs, src.students), settings, status_path,
+                                      workers=args.email_workers)
+            sent = sum(1 for r in results.values() if r.status == "sent")
+            print(f"Emailed {sent}/{len(results)} report(s); status log: {status_path}")
         return
 
     root = tk.Tk(); root.withdraw()
@@ -0,0 +1,213 @@
+
+from __future__ import annotations
+import csv, hashlib, mimetypes, os, queue, smtplib, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Callable, Dict, Iterable, List, Optional
+from .gradebook import Gradebook
+from .profiling import profiled
+
+STATUS_FIELDS = ["student_id", "email", "status", "attempts", "error", "timestamp", "digest"]
+
+@dataclass
+class SMTPSettings:
+    host: str = "localhost"
+    port: int = 25
+    sender: str = "gradebook@localhost"
+    username: Optional[str] = None
+    password: Optional[str] = None
+    starttls: bool = False
+    timeout: float = 30.0
+
+@dataclass
+class DeliveryStatus:
+    student_id: str
+    email: str
+    status: str  # "sent" | "failed" | "skipped"
+    attempts: int = 0
+    error: str = ""
+    timestamp: str = ""
+    digest: str = ""   # content_digest() of what was sent; resume only skips identical content
+
+class SMTPPool:
+    """At most `size` SMTP connections, reused across sends and threads."""
+    def __init__(self, settings: SMTPSettings, size: int = 4, factory: Optional[Callable[[], smtplib.SMTP]] = None):
+        self.settings = settings
+        self.size = size
+        self.factory = factory or self._connect
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        s = self.settings
+        conn = smtplib.SMTP(s.host, s.port, timeout=s.timeout)
+        if s.starttls: conn.starttls()
+        if s.username: conn.login(s.username, s.password or "")
+        return conn
+
+    def acquire(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self.factory()
+        except BaseException:
+            self._slots.release(); raise
+
+    def release(self, conn: smtplib.SMTP, broken: bool = False) -> None:
+        if broken:
+            try: conn.close()
+            except Exception: pass
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try: conn = self._idle.get_nowait()
+            except queue.Empty: return
+            try: conn.quit()
+            except Exception:
+                try: conn.close()
+                except Exception: pass
+
+def load_delivery_status(path: str) -> Dict[str, DeliveryStatus]:
+    """Latest status per student from the append-only status log."""
+    out: Dict[str, DeliveryStatus] = {}
+    if not os.path.exists(path):
+        return out
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            out[row["student_id"]] = DeliveryStatus(row["student_id"], row.get("email") or "", row.get("status") or "",
+                                                    int(row.get("attempts") or 0), row.get("error") or "",
+                                                    row.get("timestamp") or "", row.get("digest") or "")
+    return out
+
+def _open_status_log(path: str):
+    """Open the status log for appending, rewriting an older-format file under the current header."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    header = None
+    if os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), None)
+    if header != STATUS_FIELDS:
+        rows = []
+        if header:
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=STATUS_FIELDS, extrasaction="ignore"); w.writeheader()
+            w.writerows(rows)
+    return open(path, "a", newline="", encoding="utf-8")
+
+def content_digest(email: str, subject: str, body: str, attachments: List[str]) -> str:
+    """SHA-1 over the recipient, rendered text and attachment names/bytes."""
+    h = hashlib.sha1()
+    for part in (email, subject, body):
+        h.update(part.encode("utf-8")); h.update(b"\0")
+    for path in attachments:
+        h.update(os.path.basename(path).encode("utf-8")); h.update(b"\0")
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""): h.update(block)
+        h.update(b"\0")
+    return h.hexdigest()
+
+def collect_report_paths(folders: Iterable[str], student_ids: Iterable[str]) -> Dict[str, List[str]]:
+    """{student_id: [existing <sid>_report.csv/pdf files]} across export folders."""
+    folders = list(folders); out: Dict[str, List[str]] = {}
+    for sid in student_ids:
+        paths = [os.path.join(d, f"{sid}_report.{ext}") for d in folders for ext in ("csv", "pdf")]
+        paths = [p for p in paths if os.path.exists(p)]
+        if paths: out[sid] = paths
+    return out
+
+def build_message(settings: SMTPSettings, to: str, subject: str, body: str, attachments: List[str]) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = settings.sender; msg["To"] = to; msg["Subject"] = subject
+    msg.set_content(body)
+    for path in attachments:
+        ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        maintype, subtype = ctype.split("/", 1)
+        with open(path, "rb") as f:
+            msg.add_attachment(f.read(), maintype=maintype, subtype=subtype, filename=os.path.basename(path))
+    return msg
+
+def _permanent(e: Exception) -> bool:
+    # 5xx replies (bad mailbox, message rejected) will not succeed on retry
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in e.recipients.values())
+    return isinstance(e, smtplib.SMTPResponseException) and e.smtp_code >= 500
+
+@profiled("delivery.deliver_reports")
+def deliver_reports(gb: Gradebook, reports: Dict[str, List[str]], settings: SMTPSettings, status_path: str,
+                    workers: int = 4, pool_size: Optional[int] = None, retries: int = 3, backoff: float = 0.5,
+                    subject: str = "Your grade report",
+                    body: str = "Hello {first_name},\n\nYour grade report is attached.\n",
+                    pool: Optional[SMTPPool] = None, sleep: Callable[[float], None] = time.sleep
+                    ) -> Dict[str, DeliveryStatus]:
+    """Email each student's report files, resuming from `status_path`.
+
+    A student is skipped only if their latest "sent" record has the same
+    content digest (recipient, text and attachment bytes), so re-running an
+    interrupted batch resumes it while newly exported reports are sent again.
+    Every outcome is appended to the status log as it happens.
+    Transient failures are retried with exponential backoff on a fresh
+    connection; 5xx rejections fail immediately.
+    """
+    done = load_delivery_status(status_path)
+    own_pool = pool is None
+    pool = pool or SMTPPool(settings, size=pool_size or workers)
+    lock = threading.Lock()
+    results: Dict[str, DeliveryStatus] = {}
+    log = _open_status_log(status_path)
+    writer = csv.writer(log)
+
+    def finish(st: DeliveryStatus) -> DeliveryStatus:
+        st.timestamp = datetime.now().isoformat(timespec="seconds")
+        with lock:
+            writer.writerow([st.student_id, st.email, st.status, st.attempts, st.error, st.timestamp, st.digest])
+            log.flush()
+            results[st.student_id] = st
+        return st
+
+    def send_one(sid: str) -> DeliveryStatus:
+        student = gb.get_student(sid)
+        if not student.email:
+            return finish(DeliveryStatus(sid, "", "skipped", 0, "no email address"))
+        text = body.format(**student.__dict__)
+        try:
+            digest = content_digest(student.email, subject, text, reports[sid])
+            prev = done.get(sid)
+            if prev is not None and prev.status == "sent" and prev.digest == digest:
+                return prev   # already delivered in an earlier (interrupted) run
+            msg = build_message(settings, student.email, subject, text, reports[sid])
+        except OSError as e:
+            return finish(DeliveryStatus(sid, student.email, "failed", 0, str(e)))
+        error = ""
+        for attempt in range(1, retries + 2):
+            conn = None
+            try:
+                conn = pool.acquire()
+                conn.send_message(msg)
+                pool.release(conn)
+                return finish(DeliveryStatus(sid, student.email, "sent", attempt, digest=digest))
+            except (smtplib.SMTPException, OSError) as e:
+                if conn is not None: pool.release(conn, broken=True)
+                error = f"{type(e).__name__}: {e}"
+                if _permanent(e) or attempt > retries:
+                    break
+                sleep(backoff * (2 ** (attempt - 1)))
+        return finish(DeliveryStatus(sid, student.email, "failed", attempt, error, digest=digest))
+
+    todo = [sid for sid in reports if sid in gb.students]
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            list(ex.map(send_one, todo))
+    finally:
+        log.close()
+        if own_pool: pool.close()
+    return results
@@ -1,9 +1,14 @@
 
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
-from .models import Student, Assignment
+import heapq
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from .models import Student, Assignment, Category
 from .exceptions import InvalidGradeError, DuplicateEntityError, NotFoundError, WeightError
+from .profiling import profiled
+from .search import SearchIndex
+if TYPE_CHECKING:
+    from .history import GradeHistory
 
 def default_gpa_scale() -> List[Tuple[float, float]]:
     """5.0 max scale (Nigeria common variant)."""
@@ -16,6 +21,16 @@ def default_gpa_scale() -> List[Tuple[float, float]]:
         (0.0, 0.0),
     ]
 
+def _mean_of_best(fracs: List[float], keep: int) -> float:
+    """Mean of the `keep` largest values using partial selection (no full sort)."""
+    n = len(fracs)
+    if keep >= n:
+        return sum(fracs) / n
+    drop = n - keep
+    if drop <= keep:
+        return (sum(fracs) - sum(heapq.nsmallest(drop, fracs))) / keep
+    return sum(heapq.nlargest(keep, fracs)) / keep
+
 @dataclass
 class Gradebook:
     students: Dict[str, Student] = field(default_factory=dict)
@@ -23,57 +38,115 @@ class Gradebook:
     grades: Dict[str, Dict[str, float]] = field(default_factory=dict)
     strict_weights: bool = False
     gpa_scale: List[Tuple[float, float]] = field(default_factory=default_gpa_scale)
+    categories: Dict[str, Category] = field(default_factory=dict)
+    history: Optional["GradeHistory"] = field(default=None, repr=False, compare=False)
+    # bumped by every mutating method so derived results (e.g. transcripts) can tell when to recompute
+    version: int = field(default=0, repr=False, compare=False)
+    _index: Optional[SearchIndex] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def index(self) -> SearchIndex:
+        """Search index, built on first use (copies such as as_of() never pay for it)
+        and then kept up to date by the CRUD methods."""
+        if self._index is None:
+            self._index = SearchIndex()
+            self._index.rebuild(self.students.values(), self.assignments.values())
+        return self._index
 
     # ---- CRUD: Students ----
+    @profiled("gradebook.add_student")
     def add_student(self, student: Student) -> None:
         if student.student_id in self.students:
             raise DuplicateEntityError("Student id already exists")
         self.students[student.student_id] = student
         self.grades.setdefault(student.student_id, {})
+        if self._index is not None: self._index.add_student(student)
+        self.version += 1
 
     def get_student(self, student_id: str) -> Student:
         if student_id not in self.students:
             raise NotFoundError("Student id not found")
         return self.students[student_id]
 
+    @profiled("gradebook.update_student")
     def update_student(self, student_id: str, **updates) -> None:
         st = self.get_student(student_id)
         data = st.__dict__.copy()
         data.update(updates)
         self.students[student_id] = Student(**data)
+        if self._index is not None: self._index.add_student(self.students[student_id])
+        self.version += 1
 
+    @profiled("gradebook.delete_student")
     def delete_student(self, student_id: str) -> None:
         if student_id not in self.students:
             raise NotFoundError("Student id not found")
         del self.students[student_id]
-        self.grades.pop(student_id, None)
+        if self._index is not None: self._index.remove_student(student_id)
+        self.version += 1
+        removed = self.grades.pop(student_id, None) or {}
+        if self.history is not None:
+            self.history.record_many((student_id, aid, None) for aid in removed)
 
     # ---- CRUD: Assignments ----
+    @profiled("gradebook.add_assignment")
     def add_assignment(self, assignment: Assignment) -> None:
         if assignment.assignment_id in self.assignments:
             raise DuplicateEntityError("Assignment id already exists")
         self.assignments[assignment.assignment_id] = assignment
+        if self._index is not None: self._index.add_assignment(assignment)
+        self.version += 1
 
     def get_assignment(self, assignment_id: str) -> Assignment:
         if assignment_id not in self.assignments:
             raise NotFoundError("Assignment id not found")
         return self.assignments[assignment_id]
 
+    @profiled("gradebook.update_assignment")
     def update_assignment(self, assignment_id: str, **updates) -> None:
         a = self.get_assignment(assignment_id)
         data = a.__dict__.copy()
         data.update(updates)
         self.assignments[assignment_id] = Assignment(**data)
+        if self._index is not None: self._index.add_assignment(self.assignments[assignment_id])
+        self.version += 1
 
+    @profiled("gradebook.delete_assignment")
     def delete_assignment(self, assignment_id: str) -> None:
         if assignment_id not in self.assignments:
             raise NotFoundError("Assignment id not found")
         del self.assignments[assignment_id]
+        if self._index is not None: self._index.remove_assignment(assignment_id)
+        self.version += 1
+        removed = []
         for sid in list(self.grades.keys()):
-            self.grades[sid].pop(assignment_id, None)
+            if self.grades[sid].pop(assignment_id, None) is not None:
+                removed.append((sid, assignment_id, None))
+        if self.history is not None:
+            self.history.record_many(removed)
 
     # ---- Grades ----
+    @profiled("gradebook.enter_grade")
     def enter_grade(self, student_id: str, assignment_id: str, score: float) -> None:
+        self._check_grade(student_id, assignment_id, score)
+        self.grades.setdefault(student_id, {})[assignment_id] = float(score); self.version += 1
+        if self.history is not None:
+            self.history.record(student_id, assignment_id, float(score))
+
+    @profiled("gradebook.enter_grades")
+    def enter_grades(self, entries: Iterable[Tuple[str, str, float]]) -> int:
+        """Enter many grades at once: all are validated before any is applied."""
+        entries = list(entries)
+        for sid, aid, score in entries:
+            self._check_grade(sid, aid, score)
+        for sid, aid, score in entries:
+            self.grades.setdefault(sid, {})[aid] = float(score)
+        self.version += 1
+        if self.history is not None:
+            self.history.record_many((sid, aid, float(score)) for sid, aid, score in entries)
+        return len(entries)
+
+    def _check_grade(self, student_id: str, assignment_id: str, score: float) -> None:
         if student_id not in self.students:
             raise NotFoundError("Student id not found")
         if assignment_id not in self.assignments:
@@ -83,7 +156,6 @@ class Gradebook:
         maxp = self.assignments[assignment_id].max_points
         if score < 0 or score > maxp:
             raise InvalidGradeError(f"Score must be between 0 and {maxp}")
-        self.grades.setdefault(student_id, {})[assignment_id] = float(score)
 
     # ---- Calculations ----
     def _weights_ok(self):
@@ -96,43 +168,133 @@ class Gradebook:
             raise WeightError("Total assignment weight is zero; cannot compute final grades")
         return {aid: (a.weight / wsum) for aid, a in self.assignments.items()}
 
-    def student_percentage(self, student_id: str) -> float:
+    def _check_strict_categories(self, present) -> None:
+        wsum = sum(c.weight for c in self.categories.values())
+        if abs(wsum - 1.0) >= 1e-6:
+            raise WeightError(f"Category weights must sum to 1.0 when strict; got {wsum:.3f}")
+        missing = sorted(present - set(self.categories))
+        if missing:
+            raise WeightError(f"No category weight for assignment type(s): {', '.join(missing)}")
+
+    def _grading_plan(self) -> List[Tuple[float, List[Tuple[str, float]], int]]:
+        """Groups of (weight, [(assignment_id, max_points)], keep_count).
+
+        Without categories every assignment is its own group carrying its own
+        weight; with categories, assignments are grouped by `type` and the
+        category score is the mean of the best `keep_count` fractions.
+        Assignments whose type has no category (non-strict only) stay separate
+        groups with their own weight, normalized together with the categories.
+        """
+        if not self.categories:
+            if self.strict_weights:
+                ok, wsum = self._weights_ok()
+                if not ok:
+                    raise WeightError(f"Weights must sum to 1.0 when strict; got {wsum:.3f}")
+                weights = {aid: a.weight for aid, a in self.assignments.items()}
+            else:
+                weights = self._normalized_weights()
+            return [(weights[aid], [(aid, a.max_points)], 1) for aid, a in self.assignments.items()]
+
+        members: Dict[str, List[Tuple[str, float]]] = {}
+        for aid, a in self.assignments.items():
+            members.setdefault(a.type, []).append((aid, a.max_points))
+        groups = []
+        for name, items in members.items():
+            cat = self.categories.get(name)
+            if cat is not None:
+                groups.append((cat.weight, items, cat.keep_count(len(items))))
+            else:
+                groups.extend((self.assignments[aid].weight, [(aid, maxp)], 1) for aid, maxp in items)
         if self.strict_weights:
-            ok, wsum = self._weights_ok()
-            if not ok:
-                raise WeightError(f"Weights must sum to 1.0 when strict; got {wsum:.3f}")
-            weights = {aid: a.weight for aid, a in self.assignments.items()}
+            self._check_strict_categories(set(members))
+            scale = 1.0
         else:
-            weights = self._normalized_weights()
+            wsum = sum(w for w, _, _ in groups)
+            if wsum <= 0:
+                raise WeightError("Total category weight is zero; cannot compute final grades")
+            scale = 1.0 / wsum
+        return [(w * scale, items, keep) for w, items, keep in groups if w > 0]
 
+    @staticmethod
+    def _plan_percentage(plan, row: Dict[str, float]) -> float:
         total = 0.0
-        for aid, a in self.assignments.items():
-            score = self.grades.get(student_id, {}).get(aid)
-            s = 0.0 if score is None else (score / a.max_points)
-            total += s * weights[aid] * 100.0
+        for weight, items, keep in plan:
+            if len(items) == 1:
+                score = row.get(items[0][0])
+                s = 0.0 if score is None else (score / items[0][1])
+            else:
+                fracs = [row.get(aid, 0.0) / maxp for aid, maxp in items]
+                s = _mean_of_best(fracs, keep)
+            total += s * weight * 100.0
         return total
 
-    def student_gpa(self, student_id: str) -> float:
-        pct = self.student_percentage(student_id)
+    def _gpa_for(self, pct: float) -> float:
         for threshold, gpa in self.gpa_scale:
             if pct >= threshold:
                 return gpa
         return 0.0
 
+    @profiled("gradebook.student_percentage")
+    def student_percentage(self, student_id: str) -> float:
+        return self._plan_percentage(self._grading_plan(), self.grades.get(student_id, {}))
+
+    @profiled("gradebook.class_percentages")
+    def class_percentages(self, student_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Final % for many students, building the grading plan once."""
+        plan = self._grading_plan()
+        sids = self.students if student_ids is None else student_ids
+        return {sid: self._plan_percentage(plan, self.grades.get(sid, {})) for sid in sids}
+
+    @profiled("gradebook.student_gpa")
+    def student_gpa(self, student_id: str) -> float:
+        return self._gpa_for(self.student_percentage(student_id))
+
+    @profiled("gradebook.class_average")
     def class_average(self) -> float:
         if not self.students:
             return 0.0
-        return sum(self.student_percentage(sid) for sid in self.students) / len(self.students)
+        return sum(self.class_percentages().values()) / len(self.students)
+
+    # ---- Categories ----
+    def set_category(self, category: Category) -> None:
+        self.categories[category.name] = category; self.version += 1
+
+    def remove_category(self, name: str) -> None:
+        if name not in self.categories:
+            raise NotFoundError("Category not found")
+        del self.categories[name]; self.version += 1
 
     # ---- Curve tools ----
+    @profiled("gradebook.curve_add")
     def curve_add(self, points: float) -> None:
         for sid, gdict in self.grades.items():
             for aid, score in list(gdict.items()):
                 maxp = self.assignments[aid].max_points
                 gdict[aid] = min(score + points, maxp)
+        self._record_all()
 
+    @profiled("gradebook.curve_scale")
     def curve_scale(self, factor: float) -> None:
         for sid, gdict in self.grades.items():
             for aid, score in list(gdict.items()):
                 maxp = self.assignments[aid].max_points
                 gdict[aid] = min(score * factor, maxp)
+        self._record_all()
+
+    def _record_all(self) -> None:
+        # History skips unchanged scores, so a curve only logs the grades it moved.
+        self.version += 1
+        if self.history is not None:
+            self.history.record_many((sid, aid, s) for sid, g in self.grades.items() for aid, s in g.items())
+
+    # ---- History ----
+    def as_of(self, timestamp: float) -> "Gradebook":
+        """Copy of this gradebook with grades as recorded at `timestamp` (epoch seconds)."""
+        if self.history is None:
+            raise NotFoundError("Grade history is not enabled")
+        past = self.history.grades_as_of(timestamp)
+        grades = {sid: {aid: s for aid, s in past.get(sid, {}).items() if aid in self.assignments}
+                  for sid in self.students}
+        return Gradebook(students=dict(self.students), assignments=dict(self.assignments), grades=grades,
+                         strict_weights=self.strict_weights, gpa_scale=list(self.gpa_scale),
+                         categories=dict(self.categories))
@@ -0,0 +1,219 @@
+
+from __future__ import annotations
+import json, os, time
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .exceptions import NotFoundError
+from .profiling import profiled
+
+# On-disk layout of a history directory:
+#   grades.log                 append-only; "s <id>" / "a <id>" intern a student/assignment id,
+#                              "<dt_ms>,<s_idx>,<a_idx>,<score>" is a change (empty score = removed),
+#                              dt_ms is relative to the previous change
+#   ckpt_<seq>_<ts_ms>.json    full grades snapshot after the first <seq> changes
+LOG_NAME = "grades.log"
+
+@dataclass(frozen=True)
+class GradeChange:
+    timestamp: float
+    student_id: str
+    assignment_id: str
+    old: Optional[float]
+    new: Optional[float]
+
+class GradeHistory:
+    def __init__(self, directory: str, checkpoint_every: int = 500, clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self.clock = clock
+        # change columns, ts in integer ms (non-decreasing)
+        self._ts: List[int] = []; self._sid: List[int] = []; self._aid: List[int] = []
+        self._new: List[Optional[float]] = []
+        self._students: List[str] = []; self._assignments: List[str] = []
+        self._s_idx: Dict[str, int] = {}; self._a_idx: Dict[str, int] = {}
+        self._by_student: Dict[str, List[int]] = {}
+        self._ckpt_ts: List[int] = []; self._ckpt_seq: List[int] = []
+        self._current: Dict[str, Dict[str, float]] = {}
+        self._ckpt_cache: Tuple[int, Dict[str, Dict[str, float]]] = (-1, {})
+
+    # ---- Open / persist ----
+    @classmethod
+    def open(cls, directory: str, grades: Dict[str, Dict[str, float]], **kwargs) -> "GradeHistory":
+        """Load (or start) the history in `directory` and record any difference
+        between its latest state and `grades` (e.g. CSVs edited outside the app)."""
+        h = cls(directory, **kwargs)
+        os.makedirs(directory, exist_ok=True)
+        h._load()
+        if not h._ckpt_seq:
+            h._current = {sid: dict(g) for sid, g in grades.items()}
+            h.checkpoint()
+        else:
+            h.sync(grades)
+        return h
+
+    def _log_path(self) -> str:
+        return os.path.join(self.directory, LOG_NAME)
+
+    def _ckpt_path(self, seq: int, ts: int) -> str:
+        return os.path.join(self.directory, f"ckpt_{seq}_{ts}.json")
+
+    def _load(self) -> None:
+        ckpts = []
+        for name in os.listdir(self.directory):
+            if name.startswith("ckpt_") and name.endswith(".json"):
+                seq, ts = name[5:-5].split("_")
+                ckpts.append((int(seq), int(ts)))
+        ckpts.sort()
+        self._ckpt_seq = [s for s, _ in ckpts]; self._ckpt_ts = [t for _, t in ckpts]
+        if not ckpts:
+            return
+        # start from the latest snapshot; the log is still scanned for the time index
+        self._current = self._read_checkpoint(len(ckpts) - 1)
+        prev = 0; last_seq = self._ckpt_seq[-1]
+        path = self._log_path()
+        if not os.path.exists(path):
+            return
+        good = 0
+        with open(path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break   # torn append (crash mid-write): dropped and truncated below
+                good += len(raw)
+                line = raw.decode("utf-8").rstrip("\n")
+                if not line: continue
+                if line[0] == "s":
+                    self._intern(self._students, self._s_idx, line[2:]); continue
+                if line[0] == "a":
+                    self._intern(self._assignments, self._a_idx, line[2:]); continue
+                dt, si, ai, score = line.split(",")
+                prev += int(dt)
+                self._append(prev, int(si), int(ai), float(score) if score else None,
+                             replay=len(self._ts) >= last_seq)
+        if good < os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(good)
+
+    @staticmethod
+    def _intern(table: List[str], index: Dict[str, int], key: str) -> Tuple[int, bool]:
+        i = index.get(key)
+        if i is not None:
+            return i, False
+        index[key] = len(table); table.append(key)
+        return index[key], True
+
+    def _append(self, ts: int, si: int, ai: int, new: Optional[float], replay: bool = True) -> None:
+        sid = self._students[si]
+        if replay:
+            row = self._current.setdefault(sid, {})
+            if new is None: row.pop(self._assignments[ai], None)
+            else: row[self._assignments[ai]] = new
+        self._ts.append(ts); self._sid.append(si); self._aid.append(ai)
+        self._new.append(new)
+        self._by_student.setdefault(sid, []).append(len(self._ts) - 1)
+
+    def _checkpoint_grades(self, i: int) -> Dict[str, Dict[str, float]]:
+        seq = self._ckpt_seq[i]
+        if self._ckpt_cache[0] != seq:
+            with open(self._ckpt_path(seq, self._ckpt_ts[i]), encoding="utf-8") as f:
+                self._ckpt_cache = (seq, json.load(f)["grades"])
+        return self._ckpt_cache[1]
+
+    def _read_checkpoint(self, i: int) -> Dict[str, Dict[str, float]]:
+        return {sid: dict(g) for sid, g in self._checkpoint_grades(i).items()}
+
+    @profiled("history.checkpoint")
+    def checkpoint(self) -> None:
+        seq = len(self._ts)
+        if self._ckpt_seq and self._ckpt_seq[-1] == seq:
+            return
+        ts = self._now()
+        path = self._ckpt_path(seq, ts)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"seq": seq, "ts": ts, "grades": self._current}, f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+        self._ckpt_seq.append(seq); self._ckpt_ts.append(ts)
+
+    # ---- Recording ----
+    def _now(self) -> int:
+        now = int(self.clock() * 1000)
+        if self._ts: now = max(now, self._ts[-1])
+        return max(now, self._ckpt_ts[-1]) if self._ckpt_ts else now
+
+    def record(self, student_id: str, assignment_id: str, score: Optional[float]) -> None:
+        self.record_many([(student_id, assignment_id, score)])
+
+    @profiled("history.record_many")
+    def record_many(self, changes: Iterable[Tuple[str, str, Optional[float]]]) -> None:
+        """Append changes (score None = grade removed); no-op changes are skipped."""
+        ts = self._now(); prev = self._ts[-1] if self._ts else 0
+        lines = []
+        for sid, aid, score in changes:
+            score = None if score is None else float(score)
+            if self._current.get(sid, {}).get(aid) == score:
+                continue
+            si, new_s = self._intern(self._students, self._s_idx, sid)
+            if new_s: lines.append(f"s {sid}")
+            ai, new_a = self._intern(self._assignments, self._a_idx, aid)
+            if new_a: lines.append(f"a {aid}")
+            lines.append(f"{ts - prev},{si},{ai},{'' if score is None else repr(score)}")
+            self._append(ts, si, ai, score); prev = ts
+        if not lines:
+            return
+        with open(self._log_path(), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        last = self._ckpt_seq[-1] if self._ckpt_seq else 0
+        if len(self._ts) - last >= self.checkpoint_every:
+            self.checkpoint()
+
+    def sync(self, grades: Dict[str, Dict[str, float]]) -> None:
+        """Record whatever changes turn the latest recorded state into `grades`."""
+        changes = []
+        for sid, row in self._current.items():
+            other = grades.get(sid, {})
+            changes.extend((sid, aid, None) for aid in row if aid not in other)
+        for sid, row in grades.items():
+            changes.extend((sid, aid, s) for aid, s in row.items())
+        self.record_many(changes)
+
+    # ---- Queries ----
+    def __len__(self) -> int:
+        return len(self._ts)
+
+    @profiled("history.grades_as_of")
+    def grades_as_of(self, timestamp: float) -> Dict[str, Dict[str, float]]:
+        """Grades as they stood at `timestamp` (epoch seconds): nearest earlier
+        checkpoint plus a replay of the changes after it."""
+        ts = int(timestamp * 1000)
+        i = bisect_right(self._ckpt_ts, ts) - 1
+        if i < 0:
+            raise NotFoundError("No grade history recorded before that time")
+        grades = self._read_checkpoint(i)
+        end = bisect_right(self._ts, ts)
+        for k in range(self._ckpt_seq[i], end):
+            row = grades.setdefault(self._students[self._sid[k]], {})
+            aid = self._assignments[self._aid[k]]
+            if self._new[k] is None: row.pop(aid, None)
+            else: row[aid] = self._new[k]
+        return grades
+
+    def student_history(self, student_id: str, assignment_id: Optional[str] = None) -> List[GradeChange]:
+        """Changes for one student, oldest first, from the per-student index.
+        Old values come from the previous change or the first checkpoint."""
+        out = []
+        first = self._ckpt_seq[0] if self._ckpt_seq else 0
+        last: Dict[str, Optional[float]] = {}; base = None
+        for k in self._by_student.get(student_id, []):
+            if k < first:
+                continue
+            aid = self._assignments[self._aid[k]]
+            if aid in last:
+                old = last[aid]
+            else:
+                if base is None: base = self._checkpoint_grades(0).get(student_id, {})
+                old = base.get(aid)
+            last[aid] = self._new[k]
+            if assignment_id is not None and aid != assignment_id:
+                continue
+            out.append(GradeChange(self._ts[k] / 1000.0, student_id, aid, old, self._new[k]))
+        return out
@@ -29,6 +29,26 @@ class Assignment:
         w = f"{self.weight * 100:.0f}%"
         return f"{self.name} [{self.type}] (max {self.max_points}, weight {w})"
 
+@dataclass
+class Category:
+    """Weight and drop/keep policy for all assignments whose `type` equals `name`."""
+    name: str
+    weight: float = 0.0
+    drop_lowest: int = 0
+    keep_best: int = 0
+    def __post_init__(self):
+        if not (0.0 <= self.weight <= 1.0): raise ValueError("weight must be between 0.0 and 1.0")
+        if self.drop_lowest < 0 or self.keep_best < 0: raise ValueError("drop_lowest/keep_best must be >= 0")
+    def keep_count(self, n: int) -> int:
+        """How many of `n` assignments count; at least one is always kept."""
+        k = n - self.drop_lowest
+        if self.keep_best: k = min(k, self.keep_best)
+        return max(1, min(k, n))
+    def __str__(self) -> str:
+        rule = f", drop lowest {self.drop_lowest}" if self.drop_lowest else ""
+        rule += f", keep best {self.keep_best}" if self.keep_best else ""
+        return f"{self.name} ({self.weight * 100:.0f}%{rule})"
+
 class Quiz(Assignment):
     def __init__(self, **kwargs): super().__init__(type="quiz", **kwargs)
 class Exam(Assignment):
@@ -0,0 +1,141 @@
+
+from __future__ import annotations
+import atexit, functools, inspect, json, os, threading, time
+from collections import deque
+from typing import Dict, Optional
+
+# Off unless --profile is passed or GRADEBOOK_PROFILE is set; the wrappers then cost one global check.
+ENV_VAR = "GRADEBOOK_PROFILE"
+_enabled = False
+_lock = threading.Lock()
+_stats: Dict[str, "_Stat"] = {}
+_cprofile = None
+_outputs = {"json": None, "pstats": None}
+_atexit_registered = False
+MAX_SAMPLES = 10000
+
+class _Stat:
+    __slots__ = ("calls", "total", "samples", "bytes_read", "bytes_written")
+    def __init__(self):
+        self.calls = 0; self.total = 0.0; self.samples = deque(maxlen=MAX_SAMPLES)
+        self.bytes_read = 0; self.bytes_written = 0
+
+    def as_dict(self) -> dict:
+        s = sorted(self.samples)
+        def pct(p): return s[min(len(s) - 1, int(p * len(s)))] * 1000.0 if s else 0.0
+        return {"calls": self.calls, "total_ms": self.total * 1000.0,
+                "mean_ms": (self.total / self.calls) * 1000.0 if self.calls else 0.0,
+                # percentiles cover only the most recent p_window calls (at most MAX_SAMPLES)
+                "p50_ms": pct(0.50), "p99_ms": pct(0.99), "p_window": len(s),
+                "bytes_read": self.bytes_read, "bytes_written": self.bytes_written}
+
+def is_enabled() -> bool:
+    return _enabled
+
+def _record(name: str, elapsed: float, nread: int = 0, nwritten: int = 0) -> None:
+    with _lock:
+        st = _stats.get(name)
+        if st is None: st = _stats[name] = _Stat()
+        st.calls += 1; st.total += elapsed; st.samples.append(elapsed)
+        st.bytes_read += nread; st.bytes_written += nwritten
+
+def _size(path) -> int:
+    try: return os.path.getsize(path)
+    except (OSError, TypeError): return 0
+
+def profiled(name: str, path_arg: Optional[int] = None, io: Optional[str] = None):
+    """Decorator recording calls/latency under `name`.
+
+    `path_arg` is the positional index of a file path whose size is counted as
+    bytes read (`io="read"`) or written (`io="write"`). Generator functions
+    are charged only for the time spent producing items, not the caller's loop.
+    """
+    def _bytes(args):
+        if path_arg is None or len(args) <= path_arg: return 0, 0
+        n = _size(args[path_arg])
+        return (n, 0) if io == "read" else (0, n)
+
+    def deco(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                if not _enabled:
+                    yield from fn(*args, **kwargs); return
+                # only time spent inside the generator counts, not the caller's loop body
+                elapsed = 0.0; t0 = time.perf_counter()
+                try:
+                    it = fn(*args, **kwargs)
+                    while True:
+                        try:
+                            item = next(it)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += time.perf_counter() - t0
+                        yield item
+                        t0 = time.perf_counter()
+                finally:
+                    _record(name, elapsed, *_bytes(args))
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - t0, *_bytes(args))
+        return wrapper
+    return deco
+
+def enable(json_path: Optional[str] = None, pstats_path: Optional[str] = None) -> None:
+    """Turn instrumentation on; reports are written at interpreter exit."""
+    global _enabled, _cprofile, _atexit_registered
+    if not _atexit_registered:
+        atexit.register(_dump_at_exit); _atexit_registered = True
+    _enabled = True
+    if json_path: _outputs["json"] = json_path
+    if pstats_path:
+        _outputs["pstats"] = pstats_path
+        if _cprofile is None:
+            import cProfile
+            _cprofile = cProfile.Profile(); _cprofile.enable()
+
+def disable() -> None:
+    global _enabled, _cprofile
+    _enabled = False
+    if _cprofile is not None:
+        _cprofile.disable()
+
+def reset() -> None:
+    with _lock: _stats.clear()
+
+def report() -> Dict[str, dict]:
+    with _lock:
+        return {name: st.as_dict() for name, st in sorted(_stats.items())}
+
+def dump(json_path: Optional[str] = None, pstats_path: Optional[str] = None) -> None:
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report(), f, indent=2)
+    if pstats_path and _cprofile is not None:
+        _cprofile.disable(); _cprofile.dump_stats(pstats_path)
+
+def _dump_at_exit() -> None:
+    dump(_outputs["json"], _outputs["pstats"])
+
+def enable_from_env() -> bool:
+    """GRADEBOOK_PROFILE=1 (JSON to gradebook_profile.json), or a path ending
+    in .json/.pstats/.prof to choose the output."""
+    val = os.environ.get(ENV_VAR, "").strip()
+    if not val or val.lower() in ("0", "false", "no", "off"):
+        return False
+    if val.endswith((".pstats", ".prof")):
+        enable(json_path=os.path.splitext(val)[0] + ".json", pstats_path=val)
+    elif val.endswith(".json"):
+        enable(json_path=val)
+    else:
+        enable(json_path="gradebook_profile.json")
+    return True
@@ -1,45 +1,172 @@
 
 from __future__ import annotations
-import csv, os
+import csv, hashlib, json, os
+from typing import Dict, Iterable, List, Optional
 from .gradebook import Gradebook
+from .models import Student, Assignment
+from .profiling import profiled
 
+@profiled("reports.export_student_csv", path_arg=2, io="write")
 def export_student_csv(gb: Gradebook, student_id: str, out_path: str) -> str:
     st = gb.get_student(student_id)
+    return write_student_csv(st, gb.assignments, gb.grades.get(student_id, {}),
+                             gb.student_percentage(student_id), gb.student_gpa(student_id), out_path)
+
+def write_student_csv(st: Student, assignments: Dict[str, Assignment], grades: Dict[str, float],
+                      percentage: float, gpa: float, out_path: str) -> str:
+    """Report card from already-computed values (shared with the streaming exporter)."""
     fields = ["student_id","name","assignment_id","assignment_name","score","max_points","weight","percent"]
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     with open(out_path, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f); w.writerow(fields)
-        for aid, a in gb.assignments.items():
-            score = gb.grades.get(student_id, {}).get(aid, 0.0)
+        for aid, a in assignments.items():
+            score = grades.get(aid, 0.0)
             pct = (score / a.max_points) * 100.0 if a.max_points else 0.0
             w.writerow([st.student_id, f"{st.first_name} {st.last_name}", aid, a.name,
                         f"{score:.2f}", f"{a.max_points:.2f}", f"{a.weight:.3f}", f"{pct:.2f}"])
-        w.writerow([]); w.writerow(["Final %", f"{gb.student_percentage(student_id):.2f}"])
-        w.writerow(["GPA", f"{gb.student_gpa(student_id):.2f}"])
+        w.writerow([]); w.writerow(["Final %", f"{percentage:.2f}"])
+        w.writerow(["GPA", f"{gpa:.2f}"])
     return out_path
 
-def export_all_students_csv(gb: Gradebook, folder: str) -> str:
-    os.makedirs(folder, exist_ok=True)
-    for sid in gb.students:
-        export_student_csv(gb, sid, os.path.join(folder, f"{sid}_report.csv"))
+@profiled("reports.export_all_students_csv")
+def export_all_students_csv(gb: Gradebook, folder: str, incremental: bool = False) -> str:
+    # a full export rewrites every file but still records fingerprints for later incremental runs
+    export_changed_students(gb, folder, fmt="csv", force=not incremental)
     return folder
 
+@profiled("reports.export_student_pdf", path_arg=2, io="write")
 def export_student_pdf(gb: Gradebook, student_id: str, out_path: str) -> str:
+    st = gb.get_student(student_id)
+    return write_student_pdf(st, gb.assignments, gb.grades.get(student_id, {}),
+                             gb.student_percentage(student_id), gb.student_gpa(student_id), out_path)
+
+def _pdf_canvas(out_path: str):
     try:
         from reportlab.lib.pagesizes import A4
         from reportlab.lib.units import cm
         from reportlab.pdfgen import canvas
     except Exception as e:
         raise RuntimeError("PDF export requires reportlab. Install with 'pip install reportlab'.") from e
-    st = gb.get_student(student_id); os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    c = canvas.Canvas(out_path, pagesize=A4); W,H=A4; y=H-2*cm
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    return canvas.Canvas(out_path, pagesize=A4), A4, cm
+
+def write_student_pdf(st: Student, assignments: Dict[str, Assignment], grades: Dict[str, float],
+                      percentage: float, gpa: float, out_path: str) -> str:
+    c, (W,H), cm = _pdf_canvas(out_path); y=H-2*cm
     c.setFont("Helvetica-Bold", 16); c.drawString(2*cm, y, "Student Grade Report"); y-=1*cm
     c.setFont("Helvetica", 12); c.drawString(2*cm, y, f"Name: {st.first_name} {st.last_name} (ID: {st.student_id})"); y-=0.5*cm
-    c.drawString(2*cm, y, f"Final %: {gb.student_percentage(student_id):.2f}   GPA: {gb.student_gpa(student_id):.2f}"); y-=1*cm
+    c.drawString(2*cm, y, f"Final %: {percentage:.2f}   GPA: {gpa:.2f}"); y-=1*cm
     c.setFont("Helvetica-Bold", 12); c.drawString(2*cm, y, "Assignments:"); y-=0.6*cm; c.setFont("Helvetica", 11)
-    for aid, a in gb.assignments.items():
-        score = gb.grades.get(student_id, {}).get(aid, 0.0); pct=(score/a.max_points)*100.0 if a.max_points else 0.0
+    for aid, a in assignments.items():
+        score = grades.get(aid, 0.0); pct=(score/a.max_points)*100.0 if a.max_points else 0.0
         line = f"{a.name} [{a.type}]  score: {score:.2f}/{a.max_points:.2f}  weight: {a.weight:.2f}  pct: {pct:.1f}%"
         c.drawString(2*cm, y, line); y-=0.5*cm
         if y<2*cm: c.showPage(); y=H-2*cm; c.setFont("Helvetica", 11)
     c.showPage(); c.save(); return out_path
+
+@profiled("reports.export_all_students_pdf")
+def export_all_students_pdf(gb: Gradebook, folder: str, incremental: bool = False) -> str:
+    # a full export rewrites every file but still records fingerprints for later incremental runs
+    export_changed_students(gb, folder, fmt="pdf", force=not incremental)
+    return folder
+
+# ---- Transcripts ----
+# `terms` rows: (term, [(course_id, credits, percentage, grade_points)], term_gpa, cumulative_gpa)
+def write_transcript_csv(st: Student, terms: List[tuple], out_path: str) -> str:
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f); w.writerow(["student_id","name","term","course_id","credits","percent","grade_points"])
+        for term, courses, term_gpa, cum_gpa in terms:
+            for course_id, credits, pct, gp in courses:
+                w.writerow([st.student_id, f"{st.first_name} {st.last_name}", term, course_id,
+                            f"{credits:g}", f"{pct:.2f}", f"{gp:.2f}"])
+            w.writerow([st.student_id, f"{st.first_name} {st.last_name}", term, "Term GPA", "", "", f"{term_gpa:.2f}"])
+        w.writerow([]); w.writerow(["Cumulative GPA", f"{terms[-1][3]:.2f}" if terms else "0.00"])
+    return out_path
+
+def write_transcript_pdf(st: Student, terms: List[tuple], out_path: str) -> str:
+    c, (W,H), cm = _pdf_canvas(out_path); y=H-2*cm
+    c.setFont("Helvetica-Bold", 16); c.drawString(2*cm, y, "Academic Transcript"); y-=1*cm
+    c.setFont("Helvetica", 12); c.drawString(2*cm, y, f"Name: {st.first_name} {st.last_name} (ID: {st.student_id})"); y-=1*cm
+    for term, courses, term_gpa, cum_gpa in terms:
+        c.setFont("Helvetica-Bold", 12); c.drawString(2*cm, y, f"{term}"); y-=0.6*cm; c.setFont("Helvetica", 11)
+        for course_id, credits, pct, gp in courses:
+            c.drawString(2*cm, y, f"{course_id}  credits: {credits:g}  pct: {pct:.1f}%  grade points: {gp:.2f}"); y-=0.5*cm
+            if y<2*cm: c.showPage(); y=H-2*cm; c.setFont("Helvetica", 11)
+        c.drawString(2*cm, y, f"Term GPA: {term_gpa:.2f}   Cumulative GPA: {cum_gpa:.2f}"); y-=0.8*cm
+        if y<2*cm: c.showPage(); y=H-2*cm
+    c.showPage(); c.save(); return out_path
+
+# ---- Export cache ----
+# Bump when report layout changes so cached files are re-rendered.
+REPORT_FORMAT_VERSION = 1
+_EXPORTERS = {"csv": export_student_csv, "pdf": export_student_pdf}
+
+def manifest_path(folder: str) -> str:
+    """Manifest lives next to the output folder: <folder>.manifest.json."""
+    folder = os.path.normpath(folder)
+    return os.path.join(os.path.dirname(folder), os.path.basename(folder) + ".manifest.json")
+
+def drop_manifest(folder: str) -> None:
+    """Forget every fingerprint for `folder`, e.g. before files are written there
+    by something that does not record them (streaming mode)."""
+    try: os.remove(manifest_path(folder))
+    except FileNotFoundError: pass
+
+def _digest(obj) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")).hexdigest()
+
+def _shared_inputs(gb: Gradebook) -> list:
+    """Class-wide inputs every report card depends on."""
+    return [REPORT_FORMAT_VERSION,
+            [[a.assignment_id, a.name, a.max_points, a.weight, a.type] for a in gb.assignments.values()],
+            gb.gpa_scale, gb.strict_weights,
+            [[c.name, c.weight, c.drop_lowest, c.keep_best] for c in gb.categories.values()]]
+
+def report_fingerprint(gb: Gradebook, student_id: str, fmt: str, shared: Optional[str] = None) -> str:
+    st = gb.get_student(student_id)
+    shared = shared or _digest(_shared_inputs(gb))
+    return _digest([shared, fmt, [st.student_id, st.first_name, st.last_name, st.email],
+                    sorted(gb.grades.get(student_id, {}).items())])
+
+def _load_manifest(path: str) -> Dict[str, str]:
+    try:
+        with open(path, encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+@profiled("reports.export_changed_students")
+def export_changed_students(gb: Gradebook, folder: str, fmt: str = "csv",
+                            student_ids: Optional[Iterable[str]] = None, force: bool = False) -> List[str]:
+    """Render only the report cards whose inputs changed since the last run.
+
+    Each file's fingerprint (student row, grades, assignment definitions, GPA
+    scale, weight mode, format) is kept in the manifest; files whose
+    fingerprint matches and still exist are skipped unless `force` is set.
+    Returns the paths written.
+    """
+    if fmt not in _EXPORTERS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    os.makedirs(folder, exist_ok=True)
+    mpath = manifest_path(folder)
+    manifest = _load_manifest(mpath)
+    shared = _digest(_shared_inputs(gb))
+    sids = list(gb.students) if student_ids is None else list(student_ids)
+    written = []
+    try:
+        for sid in sids:
+            name = f"{sid}_report.{fmt}"; out = os.path.join(folder, name)
+            fp = report_fingerprint(gb, sid, fmt, shared)
+            if not force and manifest.get(name) == fp and os.path.exists(out):
+                continue
+            _EXPORTERS[fmt](gb, sid, out)
+            manifest[name] = fp; written.append(out)
+    finally:
+        if student_ids is None:
+            live = {f"{sid}_report.{fmt}" for sid in gb.students}
+            manifest = {k: v for k, v in manifest.items() if k in live or not k.endswith("." + fmt)}
+        tmp = mpath + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=0, sort_keys=True)
+        os.replace(tmp, mpath)
+    return written
@@ -0,0 +1,202 @@
+
+from __future__ import annotations
+from bisect import insort
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .models import Student, Assignment
+
+@dataclass(frozen=True)
+class SearchHit:
+    kind: str   # "student" | "assignment"
+    key: str    # student_id / assignment_id
+    label: str
+    score: float
+
+# Prefixes up to this length keep a bounded list of their best matches
+# (shortest tokens first) so 1-3 letter type-ahead does not walk a huge subtree.
+CACHE_DEPTH = 3
+CACHE_SIZE = 64
+
+def _words(text: str) -> List[str]:
+    return (text or "").strip().lower().replace("@", " ").replace(".", " ").replace("_", " ").split()
+
+def _tokens(*fields: str, email: str = "") -> Set[str]:
+    out = set()
+    for f in fields:
+        f = (f or "").strip().lower()
+        if not f: continue
+        out.add(f); out.update(_words(f))
+    # local-part words only; the domain is shared by everyone
+    out.update(_words((email or "").split("@")[0]))
+    return out
+
+def _trigrams(token: str) -> Set[str]:
+    t = f"  {token} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+class _TokenIndex:
+    """Prefix trie plus trigram postings over the tokens of one kind of record."""
+    def __init__(self):
+        self.trie: dict = {}
+        self.trigrams: Dict[str, Set[str]] = {}
+        self.doc_tokens: Dict[str, Set[str]] = {}
+        self.doc_grams: Dict[str, Set[str]] = {}
+        self.labels: Dict[str, str] = {}
+        # prefix -> the CACHE_SIZE smallest (token length, key), sorted; every entry
+        # left out ranks at or below the last one kept
+        self.short: Dict[str, List[Tuple[int, str]]] = {}
+        self.short_count: Dict[str, int] = {}
+
+    def add(self, key: str, label: str, tokens: Set[str]) -> None:
+        if key in self.doc_tokens: self.remove(key)
+        self.doc_tokens[key] = tokens; self.labels[key] = label
+        grams = set()
+        for tok in tokens:
+            node = self.trie
+            for ch in tok: node = node.setdefault(ch, {})
+            node.setdefault("", set()).add(key)   # "" marks the end of a token
+            for d in range(1, min(len(tok), CACHE_DEPTH) + 1):
+                p = tok[:d]
+                self.short_count[p] = self.short_count.get(p, 0) + 1
+                cache = self.short.setdefault(p, []); entry = (len(tok), key)
+                if len(cache) < CACHE_SIZE or entry < cache[-1]:
+                    insort(cache, entry)
+                    if len(cache) > CACHE_SIZE: cache.pop()
+            grams |= _trigrams(tok)
+        self.doc_grams[key] = grams
+        for g in grams: self.trigrams.setdefault(g, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        tokens = self.doc_tokens.pop(key, None)
+        if tokens is None: return
+        self.labels.pop(key, None)
+        for tok in tokens:
+            for d in range(1, min(len(tok), CACHE_DEPTH) + 1):
+                p = tok[:d]
+                self.short_count[p] -= 1
+                cache = self.short[p]; entry = (len(tok), key)
+                if entry in cache: cache.remove(entry)
+            path = [self.trie]
+            for ch in tok:
+                path.append(path[-1].get(ch))
+                if path[-1] is None: break
+            else:
+                path[-1].get("", set()).discard(key)
+                if not path[-1].get(""): path[-1].pop("", None)
+                for i in range(len(tok), 0, -1):   # prune empty branches
+                    if path[i]: break
+                    del path[i - 1][tok[i - 1]]
+        for g in self.doc_grams.pop(key, ()):
+            docs = self.trigrams.get(g)
+            if docs is not None:
+                docs.discard(key)
+                if not docs: del self.trigrams[g]
+
+    def prefix(self, term: str, limit: int) -> Dict[str, float]:
+        """Docs with a token starting with `term`; shorter completions first."""
+        cache = self.short.get(term)
+        if cache:
+            out: Dict[str, float] = {}
+            for n, key in cache:
+                out.setdefault(key, 3.0 if n == len(term) else 2.0 + len(term) / n)
+            # usable if it covers `limit` docs (nothing outside outranks it) or holds every match
+            if len(out) >= limit or len(cache) == self.short_count[term]:
+                return out
+        node = self.trie
+        for ch in term:
+            node = node.get(ch)
+            if node is None: return {}
+        out = {}
+        todo = deque([(node, len(term))])
+        while todo and len(out) < limit:
+            n, depth = todo.popleft()
+            for key in n.get("", ()):
+                # exact token 3, otherwise 2 + how much of the token was typed
+                out.setdefault(key, 3.0 if depth == len(term) else 2.0 + len(term) / depth)
+            todo.extend((child, depth + 1) for ch, child in n.items() if ch)
+        return out
+
+    def fuzzy(self, term: str, limit: int, min_score: float = 0.5) -> Dict[str, float]:
+        """Share of the term's trigrams found in a record (0..1, below prefix
+        scores); candidates come from the rarest half of the trigram postings,
+        so a typo only has to leave half the trigrams intact."""
+        grams = _trigrams(term)
+        postings = sorted((self.trigrams.get(g, ()) for g in grams), key=len)
+        cands: Set[str] = set()
+        for p in postings[:len(postings) // 2 + 1]:
+            cands.update(p)
+        scored = []
+        for key in cands:
+            s = len(grams & self.doc_grams[key]) / len(grams)
+            if s >= min_score: scored.append((s, key))
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return {key: s for s, key in scored[:limit]}
+
+    def _term_score(self, key: str, term: str) -> float:
+        best = 0.0
+        for tok in self.doc_tokens[key]:
+            if tok == term: return 3.0
+            if tok.startswith(term): best = max(best, 2.0 + len(term) / len(tok))
+        if best: return best
+        grams = _trigrams(term)
+        s = len(grams & self.doc_grams[key]) / len(grams)
+        return s if s >= 0.5 else 0.0
+
+    def search(self, query: str, limit: int) -> List[Tuple[float, str]]:
+        """Candidates come from the most selective term (trie prefix, or trigrams
+        when nothing starts with it); the other terms are checked per candidate.
+        If a capped candidate set filters down too far, retry with a wider one."""
+        terms = sorted(dict.fromkeys(_words(query)), key=len, reverse=True)
+        if not terms: return []
+        for pool in (max(limit * 4, 50), max(limit * 200, 2000)):
+            hits: Optional[Dict[str, float]] = None; first = ""
+            for term in terms:
+                h = self.prefix(term, pool)
+                if not h and len(term) >= 3: h = self.fuzzy(term, pool)
+                if not h: return []
+                if hits is None or len(h) < len(hits): hits, first = h, term
+                if len(h) < pool: break   # complete match set; no need to look further
+            capped = len(hits) >= pool
+            for term in terms:
+                if term == first: continue
+                scored = ((k, self._term_score(k, term)) for k in hits)
+                hits = {k: hits[k] + s for k, s in scored if s}
+            if len(hits) >= limit or not capped:
+                break
+        ranked = sorted(((s, k) for k, s in hits.items()), key=lambda x: (-x[0], x[1]))
+        return ranked[:limit]
+
+class SearchIndex:
+    """In-memory type-ahead index over students and assignments, kept up to date by Gradebook CRUD."""
+    def __init__(self):
+        self.students = _TokenIndex()
+        self.assignments = _TokenIndex()
+
+    def add_student(self, s: Student) -> None:
+        self.students.add(s.student_id, f"{s.student_id} — {s.last_name}, {s.first_name}",
+                          _tokens(s.student_id, s.first_name, s.last_name, email=s.email))
+
+    def remove_student(self, student_id: str) -> None:
+        self.students.remove(student_id)
+
+    def add_assignment(self, a: Assignment) -> None:
+        self.assignments.add(a.assignment_id, f"{a.assignment_id} — {a.name}",
+                             _tokens(a.assignment_id, a.name, a.type))
+
+    def remove_assignment(self, assignment_id: str) -> None:
+        self.assignments.remove(assignment_id)
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 10) -> List[SearchHit]:
+        if not query or not query.strip():
+            return []
+        idx = [("student", self.students), ("assignment", self.assignments)]
+        hits = [SearchHit(k, key, ix.labels[key], s)
+                for k, ix in idx if kind in (None, k) for s, key in ix.search(query, limit)]
+        hits.sort(key=lambda h: (-h.score, h.kind, h.key))
+        return hits[:limit]
+
+    def rebuild(self, students: Iterable[Student], assignments: Iterable[Assignment]) -> None:
+        self.students = _TokenIndex(); self.assignments = _TokenIndex()
+        for s in students: self.add_student(s)
+        for a in assignments: self.add_assignment(a)
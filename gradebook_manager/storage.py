@@ -2,8 +2,10 @@
 from __future__ import annotations
 import csv, os
 from typing import Iterable
-from .models import Student, Assignment
+from .models import Student, Assignment, Category
+from .profiling import profiled
 
+@profiled("storage.load_students_csv", path_arg=0, io="read")
 def load_students_csv(path: str) -> Iterable[Student]:
     with open(path, newline="", encoding="utf-8") as f:
         r = csv.DictReader(f)
@@ -15,6 +17,7 @@ def load_students_csv(path: str) -> Iterable[Student]:
                 email=row.get("email",""),
             )
 
+@profiled("storage.load_assignments_csv", path_arg=0, io="read")
 def load_assignments_csv(path: str):
     with open(path, newline="", encoding="utf-8") as f:
         r = csv.DictReader(f)
@@ -27,12 +30,26 @@ def load_assignments_csv(path: str):
                 type=row.get("type","generic"),
             )
 
+@profiled("storage.load_grades_csv", path_arg=0, io="read")
 def load_grades_csv(path: str):
     with open(path, newline="", encoding="utf-8") as f:
         r = csv.DictReader(f)
         for row in r:
             yield (row["student_id"], row["assignment_id"], float(row["score"]))
 
+@profiled("storage.load_categories_csv", path_arg=0, io="read")
+def load_categories_csv(path: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        r = csv.DictReader(f)
+        for row in r:
+            yield Category(
+                name=row["category"],
+                weight=float(row.get("weight") or 0.0),
+                drop_lowest=int(row.get("drop_lowest") or 0),
+                keep_best=int(row.get("keep_best") or 0),
+            )
+
+@profiled("storage.load_passwords_csv", path_arg=0, io="read")
 def load_passwords_csv(path: str):
     import csv, os
     mapping = {}
@@ -48,6 +65,7 @@ def load_passwords_csv(path: str):
                 mapping[(role, username)] = password
     return mapping
 
+@profiled("storage.save_passwords_csv", path_arg=0, io="write")
 def save_passwords_csv(path: str, mapping):
     import csv, os
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -57,6 +75,7 @@ def save_passwords_csv(path: str, mapping):
         for (role, username), password in mapping.items():
             w.writerow([role, username, password])
 
+@profiled("storage.save_students_csv", path_arg=0, io="write")
 def save_students_csv(path: str, students: dict):
     import csv, os
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -66,6 +85,7 @@ def save_students_csv(path: str, students: dict):
         for s in students.values():
             w.writerow([s.student_id, s.first_name, s.last_name, s.email])
 
+@profiled("storage.save_assignments_csv", path_arg=0, io="write")
 def save_assignments_csv(path: str, assignments: dict):
     import csv, os
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -75,6 +95,7 @@ def save_assignments_csv(path: str, assignments: dict):
         for a in assignments.values():
             w.writerow([a.assignment_id, a.name, f"{a.max_points:.6g}", f"{a.weight:.6g}", a.type])
 
+@profiled("storage.save_grades_csv", path_arg=0, io="write")
 def save_grades_csv(path: str, grades: dict):
     import csv, os
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -85,4 +106,12 @@ def save_grades_csv(path: str, grades: dict):
             for aid, score in gdict.items():
                 w.writerow([sid, aid, f"{float(score):.6g}"])
 
-
+@profiled("storage.save_categories_csv", path_arg=0, io="write")
+def save_categories_csv(path: str, categories: dict):
+    import csv, os
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["category","weight","drop_lowest","keep_best"])
+        for c in categories.values():
+            w.writerow([c.name, f"{c.weight:.6g}", c.drop_lowest, c.keep_best])
@@ -0,0 +1,146 @@
+
+from __future__ import annotations
+import csv, heapq, os, shutil, tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .gradebook import Gradebook
+from .models import Student
+from .profiling import profiled
+from .reports import drop_manifest, write_student_csv, write_student_pdf
+from .storage import load_grades_csv, load_students_csv
+
+# Out-of-core processing: grades.csv is sorted by student id in chunks of
+# `chunk_rows` rows spilled to temp files, merged back with heapq.merge, and
+# consumed one student at a time. Only the assignment definitions and one
+# student's grades are held in memory.
+CHUNK_ROWS = 200_000
+FAN_IN = 64
+
+@dataclass
+class AssignmentStats:
+    count: int = 0
+    total: float = 0.0
+    min: Optional[float] = None
+    max: Optional[float] = None
+    def add(self, score: float) -> None:
+        self.count += 1; self.total += score
+        self.min = score if self.min is None else min(self.min, score)
+        self.max = score if self.max is None else max(self.max, score)
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+@dataclass
+class StreamSummary:
+    students: int = 0
+    class_average: float = 0.0
+    assignment_stats: Dict[str, AssignmentStats] = field(default_factory=dict)
+    skipped_rows: int = 0
+    spill_files: int = 0
+
+def _write_run(rows: List[tuple], tmpdir: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=".csv", dir=tmpdir)
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+def _read_run(path: str, width: int) -> Iterator[tuple]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            # (key, seq, *payload); seq keeps the original file order for ties
+            yield (row[0], int(row[1]), *row[2:width])
+
+def external_sort(rows: Iterable[tuple], tmpdir: str, chunk_rows: int = CHUNK_ROWS,
+                  fan_in: int = FAN_IN) -> Tuple[Iterator[tuple], int]:
+    """Sort (key, *payload) rows by key, stable, in bounded memory.
+
+    Returns (iterator of (key, seq, *payload), number of spill files written).
+    Rows are read back as strings, so payloads should be strings.
+    """
+    runs: List[str] = []; chunk: List[tuple] = []; seq = 0; width = 0
+    for row in rows:
+        chunk.append((row[0], seq, *row[1:])); seq += 1; width = len(row) + 1
+        if len(chunk) >= chunk_rows:
+            chunk.sort(key=lambda r: (r[0], r[1])); runs.append(_write_run(chunk, tmpdir)); chunk = []
+    chunk.sort(key=lambda r: (r[0], r[1]))
+    if not runs:
+        return iter(chunk), 0
+    if chunk: runs.append(_write_run(chunk, tmpdir))
+    spilled = len(runs)
+    while len(runs) > fan_in:   # multi-pass merge keeps open files bounded
+        merged = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i:i + fan_in]
+            merged.append(_write_run(heapq.merge(*(_read_run(p, width) for p in group), key=lambda r: (r[0], r[1])), tmpdir))
+            for p in group: os.remove(p)
+        runs = merged; spilled += len(merged)
+    return heapq.merge(*(_read_run(p, width) for p in runs), key=lambda r: (r[0], r[1])), spilled
+
+def _group(sorted_rows: Iterator[tuple]) -> Iterator[Tuple[str, List[tuple]]]:
+    cur = None; bucket: List[tuple] = []
+    for row in sorted_rows:
+        if row[0] != cur:
+            if cur is not None: yield cur, bucket
+            cur, bucket = row[0], []
+        bucket.append(row)
+    if cur is not None: yield cur, bucket
+
+@profiled("streaming.stream_gradebook")
+def stream_gradebook(gb: Gradebook, students_path: str, grades_path: str,
+                     summary_csv: Optional[str] = None, report_dir: Optional[str] = None,
+                     report_format: str = "csv", chunk_rows: int = CHUNK_ROWS,
+                     tmpdir: Optional[str] = None) -> StreamSummary:
+    """Per-student %/GPA, class average and per-assignment stats without loading all grades.
+
+    `gb` supplies the assignments, categories, weight mode and GPA scale; its
+    students/grades are not used. Grade rows for unknown students or
+    assignments, or with out-of-range scores, are skipped, matching what
+    `enter_grade` would reject. Per-student results go to `summary_csv` and,
+    if `report_dir` is given, to report cards written as each student is reached.
+    Any export-cache manifest for `report_dir` is dropped first, so a later
+    incremental export re-renders the files this run overwrote.
+    """
+    writer = {"csv": write_student_csv, "pdf": write_student_pdf}[report_format]
+    if report_dir: drop_manifest(report_dir)
+    plan = gb._grading_plan()
+    summary = StreamSummary(assignment_stats={aid: AssignmentStats() for aid in gb.assignments})
+    work = tempfile.mkdtemp(prefix="gradebook_stream_", dir=tmpdir)
+    out = open(summary_csv, "w", newline="", encoding="utf-8") if summary_csv else None
+    try:
+        sw = csv.writer(out) if out else None
+        if sw: sw.writerow(["student_id", "first_name", "last_name", "percentage", "gpa"])
+        roster, n1 = external_sort(((s.student_id, s.first_name, s.last_name, s.email)
+                                    for s in load_students_csv(students_path)), work, chunk_rows)
+        grades, n2 = external_sort(((sid, aid, repr(score)) for sid, aid, score in load_grades_csv(grades_path)),
+                                   work, chunk_rows)
+        summary.spill_files = n1 + n2
+        total_pct = 0.0
+        next_grades = _group(grades); pending = next(next_grades, None)
+        for sid, rows in _group(roster):
+            _, _, first, last, email = rows[0]   # first row wins, like add_student
+            st = Student(sid, first, last, email)
+            # merge-join: grade groups for ids not on the roster are skipped
+            while pending is not None and pending[0] < sid:
+                summary.skipped_rows += len(pending[1]); pending = next(next_grades, None)
+            row: Dict[str, float] = {}
+            if pending is not None and pending[0] == sid:
+                for _, _, aid, score in pending[1]:
+                    a = gb.assignments.get(aid); score = float(score)
+                    if a is None or score < 0 or score > a.max_points:
+                        summary.skipped_rows += 1; continue
+                    row[aid] = score   # later rows win, as with repeated enter_grade
+                pending = next(next_grades, None)
+            for aid, score in row.items():
+                summary.assignment_stats[aid].add(score)
+            pct = Gradebook._plan_percentage(plan, row); gpa = gb._gpa_for(pct)
+            total_pct += pct; summary.students += 1
+            if sw: sw.writerow([sid, first, last, f"{pct:.2f}", f"{gpa:.2f}"])
+            if report_dir:
+                writer(st, gb.assignments, row, pct, gpa, os.path.join(report_dir, f"{sid}_report.{report_format}"))
+        while pending is not None:
+            summary.skipped_rows += len(pending[1]); pending = next(next_grades, None)
+        summary.class_average = total_pct / summary.students if summary.students else 0.0
+    finally:
+        if out: out.close()
+        shutil.rmtree(work, ignore_errors=True)
+    return summary
@@ -0,0 +1,183 @@
+
+from __future__ import annotations
+import json, os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from .gradebook import Gradebook
+from .models import Student
+from .exceptions import DuplicateEntityError, GradebookError, NotFoundError
+from .profiling import profiled
+from .reports import write_transcript_csv, write_transcript_pdf
+
+@dataclass(frozen=True)
+class CourseResult:
+    course_id: str
+    credits: float
+    percentage: float
+    grade_points: float   # gpa_scale value of the course's final %
+
+@dataclass
+class TermAggregate:
+    credits: float = 0.0
+    quality_points: float = 0.0   # sum of credits * grade_points
+    def add(self, r: CourseResult) -> None:
+        self.credits += r.credits; self.quality_points += r.credits * r.grade_points
+    @property
+    def gpa(self) -> float:
+        return self.quality_points / self.credits if self.credits else 0.0
+
+class TranscriptEngine:
+    """Credit-weighted term and cumulative GPAs across courses.
+
+    Each course is a Gradebook registered under a term with its credit units.
+    Closing a term computes every student's results for it once (one
+    class_percentages() pass per course) and keeps only those aggregates,
+    optionally persisted to `cache_path`. Open-term results are cached per
+    course and recomputed only when that gradebook changes (its `version`,
+    weight mode or GPA scale), so edits made through Gradebook methods show
+    up on the next query without a full pass per query.
+    """
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self.term_order: List[str] = []
+        self.open_terms: Dict[str, Dict[str, Tuple[Gradebook, float]]] = {}
+        self.closed: Dict[str, Dict[str, List[CourseResult]]] = {}
+        self.students: Dict[str, Student] = {}
+        # (term, course_id) / term -> (stamp, results) for open terms
+        self._course_cache: Dict[Tuple[str, str], tuple] = {}
+        self._term_cache: Dict[str, tuple] = {}
+        if cache_path and os.path.exists(cache_path):
+            self._load_cache()
+
+    # ---- Courses / terms ----
+    def add_course(self, term: str, course_id: str, gradebook: Gradebook, credits: float) -> None:
+        if credits <= 0:
+            raise ValueError("credits must be > 0")
+        if term in self.closed:
+            raise GradebookError(f"Term {term} is closed; reopen it to add courses")
+        courses = self.open_terms.setdefault(term, {})
+        if course_id in courses:
+            raise DuplicateEntityError("Course id already exists in term")
+        if term not in self.term_order: self.term_order.append(term)
+        courses[course_id] = (gradebook, float(credits))
+
+    @staticmethod
+    def _stamp(gb: Gradebook) -> tuple:
+        return gb.version, gb.strict_weights, tuple(tuple(t) for t in gb.gpa_scale)
+
+    def _course_results(self, term: str, course_id: str, gb: Gradebook, credits: float) -> Dict[str, CourseResult]:
+        stamp = self._stamp(gb)
+        hit = self._course_cache.get((term, course_id))
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        self.students.update(gb.students)
+        res = {sid: CourseResult(course_id, credits, pct, gb._gpa_for(pct))
+               for sid, pct in gb.class_percentages().items()}
+        self._course_cache[(term, course_id)] = (stamp, res)
+        return res
+
+    def _compute_term(self, term: str) -> Dict[str, List[CourseResult]]:
+        courses = self.open_terms.get(term, {})
+        stamp = tuple((course_id, self._stamp(gb)) for course_id, (gb, _) in courses.items())
+        hit = self._term_cache.get(term)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        results: Dict[str, List[CourseResult]] = {}
+        for course_id, (gb, credits) in courses.items():
+            for sid, r in self._course_results(term, course_id, gb, credits).items():
+                results.setdefault(sid, []).append(r)
+        self._term_cache[term] = (stamp, results)
+        return results
+
+    def _forget(self, term: str) -> None:
+        self._term_cache.pop(term, None)
+        for key in [k for k in self._course_cache if k[0] == term]:
+            del self._course_cache[key]
+
+    @profiled("transcripts.close_term")
+    def close_term(self, term: str) -> None:
+        if term not in self.open_terms:
+            raise NotFoundError("Open term not found")
+        self.closed[term] = self._compute_term(term)
+        del self.open_terms[term]; self._forget(term)
+        self._save_cache()
+
+    def reopen_term(self, term: str, courses: Dict[str, Tuple[Gradebook, float]]) -> None:
+        """Drop a closed term's cached results and register its courses again."""
+        if term not in self.closed:
+            raise NotFoundError("Closed term not found")
+        del self.closed[term]
+        self.open_terms[term] = {}; self._forget(term)
+        for course_id, (gb, credits) in courses.items():
+            self.add_course(term, course_id, gb, credits)
+        self._save_cache()
+
+    def _all_results(self) -> Dict[str, Dict[str, List[CourseResult]]]:
+        # closed terms come from the cache; open ones from _compute_term's per-version cache
+        return {term: self.closed[term] if term in self.closed else self._compute_term(term)
+                for term in self.term_order}
+
+    # ---- Queries ----
+    def term_gpa(self, student_id: str, term: str) -> float:
+        results = self.closed.get(term)
+        if results is None:
+            if term not in self.open_terms:
+                raise NotFoundError(f"Term not found: {term}")
+            results = self._compute_term(term)
+        agg = TermAggregate()
+        for r in results.get(student_id, []): agg.add(r)
+        return agg.gpa
+
+    def cumulative_gpa(self, student_id: str) -> float:
+        rows = self.transcript(student_id)
+        return rows[-1][3] if rows else 0.0
+
+    def transcript(self, student_id: str, results: Optional[Dict[str, Dict[str, List[CourseResult]]]] = None) -> List[tuple]:
+        """[(term, [(course_id, credits, percentage, grade_points)], term_gpa, cumulative_gpa)]
+        for terms the student took courses in; pass `results` to reuse one batch computation."""
+        results = results if results is not None else self._all_results()
+        cum = TermAggregate(); out = []
+        for term in self.term_order:
+            courses = results[term].get(student_id)
+            if not courses: continue
+            agg = TermAggregate()
+            for r in courses: agg.add(r); cum.add(r)
+            out.append((term, [(r.course_id, r.credits, r.percentage, r.grade_points) for r in courses], agg.gpa, cum.gpa))
+        return out
+
+    @profiled("transcripts.export_transcripts")
+    def export_transcripts(self, folder: str, student_ids: Optional[Iterable[str]] = None, fmt: str = "csv") -> List[str]:
+        """Write transcripts for a cohort (default: everyone) in one pass over the term results."""
+        writer = {"csv": write_transcript_csv, "pdf": write_transcript_pdf}[fmt]
+        results = self._all_results()
+        sids = list(self.students) if student_ids is None else list(student_ids)
+        os.makedirs(folder, exist_ok=True)
+        paths = []
+        for sid in sids:
+            st = self.students.get(sid)
+            if st is None:
+                raise NotFoundError(f"Student id not found: {sid}")
+            paths.append(writer(st, self.transcript(sid, results), os.path.join(folder, f"{sid}_transcript.{fmt}")))
+        return paths
+
+    # ---- Cache ----
+    def _save_cache(self) -> None:
+        if not self.cache_path: return
+        data = {"terms": self.term_order,
+                "closed": {t: {sid: [[r.course_id, r.credits, r.percentage, r.grade_points] for r in rs]
+                               for sid, rs in res.items()} for t, res in self.closed.items()},
+                "students": {sid: [s.first_name, s.last_name, s.email] for sid, s in self.students.items()}}
+        d = os.path.dirname(os.path.abspath(self.cache_path)); os.makedirs(d, exist_ok=True)
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.cache_path)
+
+    def _load_cache(self) -> None:
+        with open(self.cache_path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.closed = {t: {sid: [CourseResult(c, cr, p, g) for c, cr, p, g in rs] for sid, rs in res.items()}
+                       for t, res in data.get("closed", {}).items()}
+        # open terms are not persisted; they are re-registered with add_course
+        self.term_order = [t for t in data.get("terms", []) if t in self.closed]
+        self.students = {sid: Student(sid, *v) for sid, v in data.get("students", {}).items()}
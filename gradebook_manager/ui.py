@@ -7,6 +7,7 @@ from .gradebook import Gradebook
 from .models import Student, Assignment
 from .reports import export_student_csv, export_student_pdf
 from .exceptions import GradebookError
+from .profiling import profiled
 
 EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
 
@@ -63,6 +64,8 @@ class GradebookApp(tk.Tk):
             toolsm = tk.Menu(m, tearoff=0)
             toolsm.add_command(label="Curve +5 points", command=lambda: self._apply_curve(kind="add", value=5))
             toolsm.add_command(label="Scale x1.05", command=lambda: self._apply_curve(kind="scale", value=1.05))
+            toolsm.add_separator()
+            toolsm.add_command(label="Grade Matrix...", command=self._open_grade_matrix)
             m.add_cascade(label="Tools", menu=toolsm)
 
         accountm = tk.Menu(m, tearoff=0)
@@ -98,6 +101,13 @@ class GradebookApp(tk.Tk):
 
         # Left pane: students
         left = ttk.Frame(main, padding=6)
+        search_bar = ttk.Frame(left)
+        ttk.Label(search_bar, text="Search").pack(side=tk.LEFT, padx=(0,4))
+        self.student_search_var = tk.StringVar(value="")
+        self.student_search = tk.Entry(search_bar, textvariable=self.student_search_var)
+        self.student_search.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        search_bar.pack(fill=tk.X, pady=(0,6))
+        self.student_search_var.trace_add("write", lambda *_: self._fill_students())
         self.students_tv = ttk.Treeview(left, columns=("id","first","last","email"), show="headings", height=10)
         for c in ("id","first","last","email"):
             self.students_tv.heading(c, text=c.title())
@@ -140,8 +150,10 @@ class GradebookApp(tk.Tk):
         as_form.pack(fill=tk.X, pady=6)
 
         grade_form = ttk.LabelFrame(right, text="Enter Grade", padding=8)
-        self.grade_sid = tk.Entry(grade_form, width=12)
-        self.grade_aid = tk.Entry(grade_form, width=12)
+        self.grade_sid = ttk.Combobox(grade_form, width=22)
+        self.grade_aid = ttk.Combobox(grade_form, width=22)
+        self.grade_sid.bind("<KeyRelease>", lambda e: self._complete(e, self.grade_sid, "student"))
+        self.grade_aid.bind("<KeyRelease>", lambda e: self._complete(e, self.grade_aid, "assignment"))
         self.grade_score = tk.Entry(grade_form, width=10)
         _grid3(grade_form, ["Student ID","Assignment ID","Score"], [self.grade_sid,self.grade_aid,self.grade_score])
         self.btn_save_grade = ttk.Button(grade_form, text="Save Grade", command=self._save_grade)
@@ -163,11 +175,11 @@ class GradebookApp(tk.Tk):
     def _toggle_role(self):
         viewer = (self.session.get("role") == "Student")
         # entries
-        for w in [self.st_id, self.st_first, self.st_last, self.st_email]:
+        for w in [self.st_id, self.st_first, self.st_last, self.st_email, self.student_search]:
             w.config(state="disabled" if viewer else "normal")
         for w in [self.as_id, self.as_name, self.as_max, self.as_weight, self.as_type,
                   self.grade_sid, self.grade_aid, self.grade_score]:
-            if isinstance(w, ttk.Combobox):
+            if w is self.as_type:
                 w.config(state="disabled" if viewer else "readonly")
             else:
                 w.config(state="disabled" if viewer else "normal")
@@ -194,12 +206,16 @@ class GradebookApp(tk.Tk):
 
     # ---------- Persistence ----------
     def _save_all_to_csv(self):
-        from .storage import save_students_csv, save_assignments_csv, save_grades_csv
+        from .storage import save_students_csv, save_assignments_csv, save_grades_csv, save_categories_csv
         save_students_csv(os.path.join(self.data_dir, "students.csv"), self.gb.students)
         save_assignments_csv(os.path.join(self.data_dir, "assignments.csv"), self.gb.assignments)
         save_grades_csv(os.path.join(self.data_dir, "grades.csv"), self.gb.grades)
+        categories_p = os.path.join(self.data_dir, "categories.csv")
+        if self.gb.categories or os.path.exists(categories_p):
+            save_categories_csv(categories_p, self.gb.categories)
 
     # ---------- Refresh ----------
+    @profiled("ui.refresh_views")
     def _refresh_views(self):
         # students
         for i in self.students_tv.get_children():
@@ -211,8 +227,7 @@ class GradebookApp(tk.Tk):
             self.students_tv.selection_set(s.student_id)
             self.students_tv.focus(s.student_id)
         else:
-            for s in self.gb.students.values():
-                self.students_tv.insert("", tk.END, iid=s.student_id, values=(s.student_id, s.first_name, s.last_name, s.email))
+            self._fill_students(clear=False)
 
         # assignments
         for i in self.assign_tv.get_children():
@@ -229,6 +244,28 @@ class GradebookApp(tk.Tk):
 
         self._update_summary()
 
+    def _fill_students(self, clear: bool = True):
+        """Teacher list: every student, or ranked search matches when the search box has text."""
+        if self.session.get("role") != "Teacher":
+            return
+        if clear:
+            for i in self.students_tv.get_children():
+                self.students_tv.delete(i)
+        query = self.student_search_var.get().strip()
+        if query:
+            rows = [self.gb.students[h.key] for h in self.gb.index.search(query, kind="student", limit=200)]
+        else:
+            rows = self.gb.students.values()
+        for s in rows:
+            self.students_tv.insert("", tk.END, iid=s.student_id, values=(s.student_id, s.first_name, s.last_name, s.email))
+
+    def _complete(self, event, box: ttk.Combobox, kind: str):
+        """Type-ahead: offer ranked matches as "<id> — <name>" entries."""
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        hits = self.gb.index.search(box.get(), kind=kind, limit=15)
+        box["values"] = [h.label for h in hits]
+
     # ---------- Actions ----------
     def _add_student(self):
         try:
@@ -285,7 +322,7 @@ class GradebookApp(tk.Tk):
 
     def _save_grade(self):
         try:
-            sid = self.grade_sid.get().strip(); aid = self.grade_aid.get().strip(); score = float(self.grade_score.get().strip())
+            sid = _picked_id(self.grade_sid.get()); aid = _picked_id(self.grade_aid.get()); score = float(self.grade_score.get().strip())
             self.gb.enter_grade(sid, aid, score)
             self._refresh_views()
             self._save_all_to_csv()
@@ -348,12 +385,272 @@ class GradebookApp(tk.Tk):
         messagebox.showinfo("Import", f"Imported {added} students")
         self._refresh_views()
 
+    def _open_grade_matrix(self):
+        GradeMatrixEditor(self, self.gb, on_commit=lambda: (self._refresh_views(), self._save_all_to_csv()))
+
     def _apply_curve(self, kind: str, value: float):
         if kind == "add":
             self.gb.curve_add(float(value))
         else:
             self.gb.curve_scale(float(value))
         self._refresh_views()
+        self._save_all_to_csv()
+
+class GradeMatrixEditor(tk.Toplevel):
+    """Students x assignments grid drawn on a canvas.
+
+    Only the visible cells are drawn. Edits stay pending until Commit, which
+    enters them with one Gradebook.enter_grades call and then calls
+    `on_commit` once (one recompute, one save).
+    """
+    CELL_W = 90; CELL_H = 24; HEAD_W = 180; HEAD_H = 28
+    C_BG = "#111827"; C_FG = "#e5e7eb"; C_GRID = "#334155"; C_HEAD = "#1f2937"
+    C_CUR = "#2563eb"; C_PENDING = "#14532d"; C_BAD = "#7f1d1d"
+
+    def __init__(self, master, gb: Gradebook, on_commit=None):
+        super().__init__(master)
+        self.title("Grade Matrix"); self.geometry("900x560"); self.configure(bg="#0f172a")
+        self.gb = gb; self.on_commit = on_commit
+        self.rows = list(gb.students); self.cols = list(gb.assignments); self.seen_version = gb.version
+        self.pending = {}                     # (sid, aid) -> text typed
+        self.cur = (0, 0); self.top = 0; self.left = 0
+        self.editor = None; self.edit_key = None   # cell the open editor belongs to
+
+        bar = ttk.Frame(self, padding=6); bar.pack(side=tk.TOP, fill=tk.X)
+        self.status_var = tk.StringVar(value="")
+        ttk.Button(bar, text="Commit", command=self.commit).pack(side=tk.LEFT, padx=4)
+        ttk.Button(bar, text="Revert", command=self.revert).pack(side=tk.LEFT, padx=4)
+        ttk.Label(bar, textvariable=self.status_var).pack(side=tk.LEFT, padx=12)
+
+        body = ttk.Frame(self); body.pack(fill=tk.BOTH, expand=True)
+        self.canvas = tk.Canvas(body, bg=self.C_BG, highlightthickness=0, takefocus=1)
+        self.vbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self._yview)
+        self.hbar = ttk.Scrollbar(body, orient=tk.HORIZONTAL, command=self._xview)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y); self.hbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        c = self.canvas
+        c.bind("<Configure>", lambda e: self.render())
+        c.bind("<Button-1>", self._click)
+        c.bind("<Double-Button-1>", lambda e: (self._click(e), self._begin_edit()))
+        c.bind("<MouseWheel>", lambda e: self._scroll_rows(-1 if e.delta > 0 else 1))
+        c.bind("<Button-4>", lambda e: self._scroll_rows(-1)); c.bind("<Button-5>", lambda e: self._scroll_rows(1))
+        for key, (dr, dc) in {"<Up>": (-1, 0), "<Down>": (1, 0), "<Left>": (0, -1), "<Right>": (0, 1),
+                              "<Tab>": (0, 1), "<Shift-Tab>": (0, -1), "<ISO_Left_Tab>": (0, -1)}.items():
+            c.bind(key, lambda e, d=(dr, dc): self._move(*d) or "break")
+        c.bind("<Prior>", lambda e: self._move(-self._visible()[0], 0))
+        c.bind("<Next>", lambda e: self._move(self._visible()[0], 0))
+        c.bind("<Return>", lambda e: self._begin_edit())
+        c.bind("<F2>", lambda e: self._begin_edit())
+        c.bind("<Delete>", lambda e: self._clear_pending())
+        c.bind("<Control-v>", lambda e: self.paste()); c.bind("<Control-V>", lambda e: self.paste())
+        c.bind("<Key>", self._type_to_edit)
+        self.protocol("WM_DELETE_WINDOW", self._close)
+        c.focus_set(); self._update_status()
+
+    # ---- geometry ----
+    def _visible(self):
+        w = max(self.canvas.winfo_width(), 1); h = max(self.canvas.winfo_height(), 1)
+        return max(1, (h - self.HEAD_H) // self.CELL_H), max(1, (w - self.HEAD_W) // self.CELL_W)
+
+    def _cell_xy(self, r, c):
+        return self.HEAD_W + (c - self.left) * self.CELL_W, self.HEAD_H + (r - self.top) * self.CELL_H
+
+    def _yview(self, *args):
+        self._view(args, vertical=True)
+
+    def _xview(self, *args):
+        self._view(args, vertical=False)
+
+    def _view(self, args, vertical):
+        n = len(self.rows) if vertical else len(self.cols)
+        page = self._visible()[0 if vertical else 1]
+        pos = self.top if vertical else self.left
+        if args[0] == "moveto": pos = int(float(args[1]) * n)
+        elif args[0] == "scroll": pos += int(args[1]) * (page if args[2] == "pages" else 1)
+        pos = max(0, min(pos, max(0, n - page)))
+        if vertical: self.top = pos
+        else: self.left = pos
+        self.render()
+
+    def _scroll_rows(self, d):
+        self._view(("scroll", d, "units"), vertical=True)
+
+    def _sync_axes(self):
+        """Follow students/assignments added or deleted in the main window while the grid is open."""
+        if self.seen_version == self.gb.version: return
+        self.seen_version = self.gb.version
+        students, assignments = self.gb.students, self.gb.assignments
+        if self.editor is not None and (self.edit_key[0] not in students or self.edit_key[1] not in assignments):
+            self._end_edit(save=False, rerender=False)
+        kept = set(self.rows)
+        self.rows = [sid for sid in self.rows if sid in students] + [sid for sid in students if sid not in kept]
+        kept = set(self.cols)
+        self.cols = [aid for aid in self.cols if aid in assignments] + [aid for aid in assignments if aid not in kept]
+        self.pending = {k: t for k, t in self.pending.items() if k[0] in students and k[1] in assignments}
+        r, c = self.cur
+        self.cur = (max(0, min(r, len(self.rows) - 1)), max(0, min(c, len(self.cols) - 1)))
+        self.top = max(0, min(self.top, len(self.rows) - 1)); self.left = max(0, min(self.left, len(self.cols) - 1))
+        self._update_status()
+
+    # ---- drawing ----
+    def render(self):
+        self._sync_axes()
+        self._end_edit(save=True, rerender=False)
+        c = self.canvas; c.delete("all")
+        nrows, ncols = self._visible()
+        rows = range(self.top, min(len(self.rows), self.top + nrows + 1))
+        cols = range(self.left, min(len(self.cols), self.left + ncols + 1))
+        for ci in cols:
+            x, _ = self._cell_xy(0, ci); a = self.gb.assignments[self.cols[ci]]
+            c.create_rectangle(x, 0, x + self.CELL_W, self.HEAD_H, fill=self.C_HEAD, outline=self.C_GRID)
+            c.create_text(x + 4, self.HEAD_H // 2, text=f"{a.assignment_id} /{a.max_points:g}", anchor="w", fill=self.C_FG)
+        for ri in rows:
+            _, y = self._cell_xy(ri, 0); st = self.gb.students[self.rows[ri]]
+            c.create_rectangle(0, y, self.HEAD_W, y + self.CELL_H, fill=self.C_HEAD, outline=self.C_GRID)
+            c.create_text(4, y + self.CELL_H // 2, text=f"{st.student_id}  {st.last_name}, {st.first_name}", anchor="w", fill=self.C_FG)
+            row_grades = self.gb.grades.get(st.student_id, {})
+            for ci in cols:
+                x, _ = self._cell_xy(ri, ci); aid = self.cols[ci]
+                key = (st.student_id, aid); fill = self.C_BG
+                if key in self.pending:
+                    text = self.pending[key]
+                    fill = self.C_PENDING if self._parse(aid, text) is not None else self.C_BAD
+                else:
+                    score = row_grades.get(aid); text = "" if score is None else f"{score:g}"
+                outline = self.C_CUR if (ri, ci) == self.cur else self.C_GRID
+                c.create_rectangle(x, y, x + self.CELL_W, y + self.CELL_H, fill=fill, outline=outline,
+                                   width=2 if outline == self.C_CUR else 1)
+                c.create_text(x + self.CELL_W - 6, y + self.CELL_H // 2, text=text, anchor="e", fill=self.C_FG)
+        c.create_rectangle(0, 0, self.HEAD_W, self.HEAD_H, fill=self.C_HEAD, outline=self.C_GRID)
+        n = max(len(self.rows), 1); m = max(len(self.cols), 1)
+        self.vbar.set(self.top / n, min(1.0, (self.top + nrows) / n))
+        self.hbar.set(self.left / m, min(1.0, (self.left + ncols) / m))
+
+    # ---- navigation ----
+    def _click(self, e):
+        if e.x < self.HEAD_W or e.y < self.HEAD_H: return
+        r = self.top + (e.y - self.HEAD_H) // self.CELL_H; c = self.left + (e.x - self.HEAD_W) // self.CELL_W
+        if r < len(self.rows) and c < len(self.cols):
+            self.canvas.focus_set(); self._goto(r, c)
+
+    def _move(self, dr, dc):
+        self._sync_axes()
+        r, c = self.cur
+        self._goto(max(0, min(len(self.rows) - 1, r + dr)), max(0, min(len(self.cols) - 1, c + dc)))
+
+    def _goto(self, r, c):
+        if not self.rows or not self.cols: return
+        self._end_edit(save=True, rerender=False)   # close the editor before the cursor moves
+        self.cur = (r, c)
+        nrows, ncols = self._visible()
+        if r < self.top: self.top = r
+        elif r >= self.top + nrows: self.top = r - nrows + 1
+        if c < self.left: self.left = c
+        elif c >= self.left + ncols: self.left = c - ncols + 1
+        self.render()
+
+    # ---- editing ----
+    def _parse(self, aid, text):
+        """Score as float if `text` is a valid entry for `aid`, else None."""
+        try: v = float(text)
+        except ValueError: return None
+        return v if 0 <= v <= self.gb.assignments[aid].max_points else None
+
+    def _key(self):
+        r, c = self.cur
+        return self.rows[r], self.cols[c]
+
+    def _type_to_edit(self, e):
+        if e.char and (e.char.isdigit() or e.char == "."):
+            self._begin_edit(initial=e.char)
+
+    def _begin_edit(self, initial=None):
+        self._sync_axes()
+        if not self.rows or not self.cols or self.editor is not None: return
+        sid, aid = self._key()
+        if initial is None:
+            initial = self.pending.get((sid, aid))
+            if initial is None:
+                score = self.gb.grades.get(sid, {}).get(aid); initial = "" if score is None else f"{score:g}"
+        x, y = self._cell_xy(*self.cur)
+        ent = tk.Entry(self.canvas, bg=self.C_BG, fg=self.C_FG, insertbackground=self.C_FG, justify="right", relief="flat")
+        ent.insert(0, initial)
+        self.canvas.create_window(x + 1, y + 1, window=ent, anchor="nw", width=self.CELL_W - 2, height=self.CELL_H - 2)
+        ent.bind("<KeyRelease>", lambda e: ent.configure(bg=self.C_BG if self._parse(aid, ent.get()) is not None or not ent.get() else self.C_BAD))
+        for key, (dr, dc) in {"<Return>": (1, 0), "<Tab>": (0, 1), "<Up>": (-1, 0), "<Down>": (1, 0)}.items():
+            ent.bind(key, lambda e, d=(dr, dc): (self._end_edit(save=True), self._move(*d)) and "break")
+        ent.bind("<Escape>", lambda e: self._end_edit(save=False))
+        self.editor = ent; self.edit_key = (sid, aid); ent.focus_set(); ent.icursor(tk.END)
+
+    def _end_edit(self, save=True, rerender=True):
+        ent = self.editor
+        if ent is None: return
+        key, self.editor, self.edit_key = self.edit_key, None, None
+        if save: self._set_pending(key, ent.get().strip())
+        ent.destroy(); self.canvas.focus_set()
+        if rerender: self.render()
+
+    def _set_pending(self, key, text):
+        sid, aid = key
+        current = self.gb.grades.get(sid, {}).get(aid)
+        if text == "" or (current is not None and self._parse(aid, text) == current):
+            self.pending.pop(key, None)
+        else:
+            self.pending[key] = text
+        self._update_status()
+
+    def _clear_pending(self):
+        self._sync_axes()
+        if self.rows and self.cols:
+            self.pending.pop(self._key(), None); self._update_status(); self.render()
+
+    def paste(self):
+        """Paste a tab/newline separated block (e.g. a spreadsheet column) at the cursor."""
+        try: data = self.clipboard_get()
+        except tk.TclError: return "break"
+        self._sync_axes()
+        r0, c0 = self.cur
+        for dr, line in enumerate(data.splitlines()):
+            if r0 + dr >= len(self.rows): break
+            for dc, cell in enumerate(line.split("\t")):
+                if c0 + dc >= len(self.cols): break
+                self._set_pending((self.rows[r0 + dr], self.cols[c0 + dc]), cell.strip())
+        self.render()
+        return "break"
+
+    def _update_status(self):
+        bad = sum(1 for (sid, aid), t in self.pending.items() if self._parse(aid, t) is None)
+        self.status_var.set(f"{len(self.pending)} pending edit(s)" + (f", {bad} invalid" if bad else ""))
+
+    def commit(self):
+        self._sync_axes(); self._end_edit(save=True)
+        bad = [(sid, aid) for (sid, aid), t in self.pending.items() if self._parse(aid, t) is None]
+        if bad:
+            sid, aid = bad[0]
+            messagebox.showerror("Grade Matrix", f"{len(bad)} invalid cell(s), e.g. {sid}/{aid}: scores must be numbers "
+                                 f"between 0 and {self.gb.assignments[aid].max_points:g}.", parent=self)
+            return
+        if not self.pending: return
+        try:
+            self.gb.enter_grades((sid, aid, self._parse(aid, t)) for (sid, aid), t in self.pending.items())
+        except GradebookError as e:
+            messagebox.showerror("Grade Matrix", str(e), parent=self); return
+        self.pending.clear(); self._update_status(); self.render()
+        if self.on_commit: self.on_commit()
+
+    def revert(self):
+        self._end_edit(save=False); self.pending.clear(); self._update_status(); self.render()
+
+    def _close(self):
+        self._sync_axes(); self._end_edit(save=True)
+        if self.pending and not messagebox.askyesno("Grade Matrix", f"Discard {len(self.pending)} pending edit(s)?", parent=self):
+            return
+        self.destroy()
+
+def _picked_id(text: str) -> str:
+    # completion entries look like "S001 — Okoro, Amaka"
+    return text.split(" — ", 1)[0].strip()
 
 def _grid4(frame, labels, widgets):
     for i,(lab,w) in enumerate(zip(labels, widgets)):
@@ -0,0 +1,65 @@
+
+"""Minimal in-process SMTP server for tests and benchmarks.
+
+Speaks just enough SMTP for smtplib (EHLO/HELO, MAIL, RCPT, DATA, RSET,
+NOOP, QUIT). Each accepted message is counted and, with `keep=True`,
+stored as (recipients, raw bytes) in `messages`.
+"""
+from __future__ import annotations
+import socketserver, threading
+from typing import List, Tuple
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.wfile.write(b"220 sink ready\r\n")
+        rcpts: List[str] = []
+        while True:
+            line = self.rfile.readline()
+            if not line: return
+            cmd = line[:4].upper()
+            if cmd == b"EHLO":
+                self.wfile.write(b"250-sink\r\n250 8BITMIME\r\n")
+            elif cmd == b"RCPT":
+                rcpts.append(line.decode("ascii", "replace").split(":", 1)[1].strip().strip("<>"))
+                self.wfile.write(b"250 ok\r\n")
+            elif cmd == b"DATA":
+                self.wfile.write(b"354 go ahead\r\n")
+                data = []
+                while True:
+                    row = self.rfile.readline()
+                    if row in (b".\r\n", b""): break
+                    data.append(row[1:] if row.startswith(b"..") else row)
+                self.server.accept(rcpts, b"".join(data)); rcpts = []
+                self.wfile.write(b"250 queued\r\n")
+            elif cmd == b"QUIT":
+                self.wfile.write(b"221 bye\r\n"); return
+            else:   # HELO, MAIL, RSET, NOOP
+                if cmd == b"RSET": rcpts = []
+                self.wfile.write(b"250 ok\r\n")
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True; allow_reuse_address = True
+
+    def __init__(self, keep: bool = False):
+        super().__init__(("127.0.0.1", 0), _SinkHandler)
+        self.keep = keep; self.count = 0
+        self.messages: List[Tuple[List[str], bytes]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def accept(self, rcpts: List[str], raw: bytes) -> None:
+        with self._lock:
+            self.count += 1
+            if self.keep: self.messages.append((rcpts, raw))
+
+    def start(self) -> "SMTPSink":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __enter__(self): return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown(); self.server_close()
@@ -0,0 +1,100 @@
+
+import csv, email, email.policy, smtplib
+from gradebook_manager.delivery import SMTPPool, SMTPSettings, STATUS_FIELDS, deliver_reports, load_delivery_status
+from gradebook_manager.gradebook import Gradebook
+from gradebook_manager.models import Student
+from tests.smtp_sink import SMTPSink
+
+class FakeSMTP:
+    """Stand-in connection: pops the next scripted outcome (an exception to raise, or None) per send."""
+    def __init__(self, server):
+        self.server = server; self.closed = False
+    def send_message(self, msg):
+        outcome = self.server.script.get(msg["To"], [])
+        err = outcome.pop(0) if outcome else None
+        if err is not None: raise err
+        self.server.sent.append(msg["To"])
+    def quit(self): self.closed = True
+    def close(self): self.closed = True
+
+class FakeServer:
+    def __init__(self, script=None):
+        self.script = script or {}; self.sent = []; self.connections = 0
+    def connect(self):
+        self.connections += 1; return FakeSMTP(self)
+
+def _setup(tmp_path, n=3):
+    gb = Gradebook(); reports = {}
+    for i in range(n):
+        sid = f"S{i}"
+        gb.add_student(Student(sid, f"First{i}", f"Last{i}", f"s{i}@example.edu"))
+        p = tmp_path / f"{sid}_report.csv"; p.write_text(f"report {i}\n", encoding="utf-8")
+        reports[sid] = [str(p)]
+    return gb, reports
+
+def _deliver(gb, reports, server, status_path, sleeps=None):
+    settings = SMTPSettings()
+    pool = SMTPPool(settings, size=2, factory=server.connect)
+    return deliver_reports(gb, reports, settings, status_path, workers=2, pool=pool, retries=2, backoff=0.5,
+                           sleep=(sleeps.append if sleeps is not None else lambda s: None))
+
+def test_transient_errors_are_retried_with_backoff(tmp_path):
+    gb, reports = _setup(tmp_path, 1)
+    server = FakeServer({"s0@example.edu": [smtplib.SMTPServerDisconnected("gone"), OSError("reset")]})
+    sleeps = []
+    res = _deliver(gb, reports, server, str(tmp_path / "status.csv"), sleeps)
+    assert res["S0"].status == "sent" and res["S0"].attempts == 3
+    assert sleeps == [0.5, 1.0]
+    assert server.connections == 3   # broken connections are not reused
+
+def test_permanent_rejection_is_not_retried(tmp_path):
+    gb, reports = _setup(tmp_path, 2)
+    refused = smtplib.SMTPRecipientsRefused({"s1@example.edu": (550, b"no such user")})
+    server = FakeServer({"s1@example.edu": [refused]})
+    sleeps = []
+    res = _deliver(gb, reports, server, str(tmp_path / "status.csv"), sleeps)
+    assert res["S1"].status == "failed" and res["S1"].attempts == 1 and sleeps == []
+    assert res["S0"].status == "sent"
+
+def test_resume_skips_only_identical_content(tmp_path):
+    gb, reports = _setup(tmp_path, 3)
+    status = str(tmp_path / "status.csv")
+    down = [smtplib.SMTPServerDisconnected("down")] * 3
+    first = FakeServer({"s2@example.edu": list(down)})
+    assert _deliver(gb, reports, first, status)["S2"].status == "failed"
+    second = FakeServer()
+    assert set(_deliver(gb, reports, second, status)) == {"S2"}
+    assert second.sent == ["s2@example.edu"]
+    # a new export changes S0's file: it is sent again, the rest are not
+    (tmp_path / "S0_report.csv").write_text("report 0, week 2\n", encoding="utf-8")
+    third = FakeServer()
+    _deliver(gb, reports, third, status)
+    assert third.sent == ["s0@example.edu"]
+    assert {sid: st.status for sid, st in load_delivery_status(status).items()} == \
+        {"S0": "sent", "S1": "sent", "S2": "sent"}
+
+def test_old_status_file_is_upgraded(tmp_path):
+    gb, reports = _setup(tmp_path, 1)
+    status = tmp_path / "status.csv"
+    status.write_text("student_id,email,status,attempts,error,timestamp\n"
+                      "S0,s0@example.edu,sent,1,,2026-01-01T00:00:00\n", encoding="utf-8")
+    server = FakeServer()
+    _deliver(gb, reports, server, str(status))
+    assert server.sent == ["s0@example.edu"]   # no digest recorded, so it cannot be proven identical
+    with open(status, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == STATUS_FIELDS and len(rows) == 3
+
+def test_end_to_end_over_local_smtp(tmp_path):
+    gb, reports = _setup(tmp_path, 3)
+    with SMTPSink(keep=True) as sink:
+        settings = SMTPSettings(host="127.0.0.1", port=sink.port, sender="grades@example.edu", timeout=5)
+        res = deliver_reports(gb, reports, settings, str(tmp_path / "status.csv"), workers=2)
+    assert {sid: st.status for sid, st in res.items()} == {"S0": "sent", "S1": "sent", "S2": "sent"}
+    got = {}
+    for rcpts, raw in sink.messages:
+        msg = email.message_from_bytes(raw, policy=email.policy.default)
+        att = [(p.get_filename(), p.get_content()) for p in msg.iter_attachments()]
+        got[tuple(rcpts)] = (msg["To"], msg["From"], att)
+    assert got[("s1@example.edu",)] == ("s1@example.edu", "grades@example.edu", [("S1_report.csv", "report 1\n")])
+    assert len(got) == 3
@@ -0,0 +1,50 @@
+
+import pytest
+from gradebook_manager.exceptions import InvalidGradeError, NotFoundError, WeightError
+from gradebook_manager.gradebook import Gradebook
+from gradebook_manager.models import Student, Assignment, Category
+
+def _gradebook():
+    gb = Gradebook()
+    gb.add_student(Student("S1", "Ada", "Obi"))
+    for i, score in enumerate([2, 6, 10]):
+        gb.add_assignment(Assignment(f"Q{i}", f"Quiz {i}", max_points=10, type="quiz"))
+        gb.enter_grade("S1", f"Q{i}", score)
+    gb.add_assignment(Assignment("E1", "Exam", max_points=10, weight=0.5, type="exam"))
+    gb.enter_grade("S1", "E1", 10)
+    return gb
+
+def test_category_drop_lowest():
+    gb = _gradebook()
+    gb.set_category(Category("quiz", 0.5, drop_lowest=1)); gb.set_category(Category("exam", 0.5))
+    assert gb.student_percentage("S1") == pytest.approx(0.5 * 80 + 0.5 * 100)
+
+def test_uncategorized_type_keeps_its_weight():
+    gb = _gradebook()
+    gb.set_category(Category("quiz", 0.5))
+    assert gb.student_percentage("S1") == pytest.approx(0.5 * 60 + 0.5 * 100)
+    gb.strict_weights = True
+    with pytest.raises(WeightError):
+        gb.student_percentage("S1")
+
+class _Recorder:
+    def __init__(self): self.batches = []
+    def record(self, sid, aid, score): self.batches.append([(sid, aid, score)])
+    def record_many(self, changes): self.batches.append(list(changes))
+
+@pytest.mark.parametrize("bad, error", [(("S1", "Q1", 11), InvalidGradeError),
+                                        (("S9", "Q1", 5), NotFoundError),
+                                        (("S1", "Q1", "7"), InvalidGradeError)])
+def test_enter_grades_rejects_whole_batch(bad, error):
+    gb = _gradebook(); gb.history = _Recorder()
+    before = {sid: dict(g) for sid, g in gb.grades.items()}; version = gb.version
+    with pytest.raises(error):
+        gb.enter_grades([("S1", "Q0", 9), bad, ("S1", "E1", 1)])
+    assert gb.grades == before and gb.version == version and gb.history.batches == []
+
+def test_enter_grades_applies_batch_once():
+    gb = _gradebook(); gb.history = _Recorder(); version = gb.version
+    assert gb.enter_grades([("S1", "Q0", 9), ("S1", "E1", 1.5)]) == 2
+    assert gb.grades["S1"]["Q0"] == 9.0 and gb.grades["S1"]["E1"] == 1.5
+    assert gb.version == version + 1
+    assert gb.history.batches == [[("S1", "Q0", 9.0), ("S1", "E1", 1.5)]]
@@ -0,0 +1,53 @@
+
+import os, random
+import pytest
+from gradebook_manager.exceptions import NotFoundError
+from gradebook_manager.history import GradeHistory, LOG_NAME
+
+class Clock:
+    def __init__(self): self.t = 1_000_000.0
+    def __call__(self): self.t += 1.0; return self.t
+
+def _random_edits(h, n, seed=0):
+    rnd = random.Random(seed); state = {}; snaps = []
+    for _ in range(n):
+        sid = f"S{rnd.randrange(20)}"; aid = f"A{rnd.randrange(5)}"
+        score = None if rnd.random() < 0.15 else round(rnd.uniform(0, 10), 3)
+        h.record(sid, aid, score)
+        if score is None: state.get(sid, {}).pop(aid, None)
+        else: state.setdefault(sid, {})[aid] = score
+        snaps.append((h.clock.t, {k: dict(v) for k, v in state.items() if v}))
+    return state, snaps
+
+def _strip(g): return {k: v for k, v in g.items() if v}
+
+def test_as_of_matches_reference_after_reopen(tmp_path):
+    clock = Clock()
+    h = GradeHistory.open(str(tmp_path), {}, checkpoint_every=7, clock=clock)
+    state, snaps = _random_edits(h, 300)
+    h2 = GradeHistory.open(str(tmp_path), state, checkpoint_every=7, clock=clock)
+    assert len(h2) == len(h)
+    assert _strip(h2._current) == state
+    for t, expected in snaps[::17]:
+        assert _strip(h2.grades_as_of(t)) == expected
+    with pytest.raises(NotFoundError):
+        h2.grades_as_of(0)
+
+def test_student_history_old_values(tmp_path):
+    h = GradeHistory.open(str(tmp_path), {"S1": {"A1": 4.0}}, checkpoint_every=2, clock=Clock())
+    h.record("S1", "A1", 6.0); h.record("S1", "A2", 3.0); h.record("S1", "A1", None)
+    h2 = GradeHistory.open(str(tmp_path), {"S1": {"A2": 3.0}}, checkpoint_every=2, clock=Clock())
+    assert [(c.assignment_id, c.old, c.new) for c in h2.student_history("S1")] == \
+        [("A1", 4.0, 6.0), ("A2", None, 3.0), ("A1", 6.0, None)]
+    assert [c.new for c in h2.student_history("S1", "A2")] == [3.0]
+
+def test_torn_last_line_is_dropped(tmp_path):
+    h = GradeHistory.open(str(tmp_path), {}, clock=Clock())
+    h.record("S1", "A1", 5.0)
+    log = os.path.join(str(tmp_path), LOG_NAME)
+    with open(log, "a", encoding="utf-8") as f: f.write("12,0")
+    h2 = GradeHistory.open(str(tmp_path), {"S1": {"A1": 5.0}}, clock=Clock())
+    assert len(h2) == 1
+    h2.record("S1", "A1", 7.0)
+    h3 = GradeHistory.open(str(tmp_path), {"S1": {"A1": 7.0}}, clock=Clock())
+    assert [c.new for c in h3.student_history("S1")] == [5.0, 7.0]
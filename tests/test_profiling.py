@@ -0,0 +1,81 @@
+
+import json, time
+import pytest
+from gradebook_manager import profiling
+
+@pytest.fixture(autouse=True)
+def _clean(monkeypatch):
+    # keep the module's global switch and outputs from leaking between tests
+    monkeypatch.setattr(profiling, "_enabled", False)
+    monkeypatch.setattr(profiling, "_atexit_registered", True)
+    monkeypatch.setattr(profiling, "_outputs", {"json": None, "pstats": None})
+    monkeypatch.delenv(profiling.ENV_VAR, raising=False)
+    profiling.reset()
+    yield
+    profiling.reset()
+
+def test_nothing_recorded_while_disabled():
+    f = profiling.profiled("t.f")(lambda x: x + 1)
+    assert f(1) == 2
+    assert profiling.report() == {}
+
+def test_calls_totals_and_percentiles(monkeypatch):
+    ticks = iter([0.0, 0.001, 1.0, 1.003, 2.0, 2.010])   # 1 ms, 3 ms, 10 ms
+    monkeypatch.setattr(profiling.time, "perf_counter", lambda: next(ticks))
+    f = profiling.profiled("t.f")(lambda: None)
+    profiling.enable()
+    for _ in range(3): f()
+    r = profiling.report()["t.f"]
+    assert r["calls"] == 3 and r["p_window"] == 3
+    assert r["total_ms"] == pytest.approx(14.0) and r["mean_ms"] == pytest.approx(14.0 / 3)
+    assert r["p50_ms"] == pytest.approx(3.0) and r["p99_ms"] == pytest.approx(10.0)
+
+def test_percentile_window_is_reported(monkeypatch):
+    monkeypatch.setattr(profiling, "MAX_SAMPLES", 5)
+    f = profiling.profiled("t.f")(lambda: None)
+    profiling.enable()
+    for _ in range(8): f()
+    r = profiling.report()["t.f"]
+    assert r["calls"] == 8 and r["p_window"] == 5
+
+def test_bytes_counted_from_path_arg(tmp_path):
+    src = tmp_path / "in.txt"; src.write_bytes(b"x" * 123)
+    dst = tmp_path / "out.txt"
+    read = profiling.profiled("t.read", path_arg=0, io="read")(lambda p: open(p, "rb").read())
+    write = profiling.profiled("t.write", path_arg=1, io="write")(lambda data, p: open(p, "wb").write(data))
+    profiling.enable()
+    write(read(str(src)) * 2, str(dst))
+    r = profiling.report()
+    assert (r["t.read"]["bytes_read"], r["t.read"]["bytes_written"]) == (123, 0)
+    assert (r["t.write"]["bytes_read"], r["t.write"]["bytes_written"]) == (0, 246)
+
+def test_generator_not_charged_for_consumer_loop():
+    @profiling.profiled("t.gen")
+    def gen():
+        for i in range(5):
+            time.sleep(0.002); yield i
+    profiling.enable()
+    assert [x for x in gen() if time.sleep(0.02) is None] == list(range(5))
+    r = profiling.report()["t.gen"]
+    assert r["calls"] == 1
+    assert 10.0 <= r["total_ms"] < 60.0   # ~10 ms of its own work, not the ~100 ms of consumer sleeps
+
+@pytest.mark.parametrize("value, json_path, pstats_path", [
+    ("", None, None), ("0", None, None), ("off", None, None), ("False", None, None),
+    ("1", "gradebook_profile.json", None),
+    ("out/prof.json", "out/prof.json", None),
+    ("out/prof.pstats", "out/prof.json", "out/prof.pstats"),
+])
+def test_enable_from_env(monkeypatch, value, json_path, pstats_path):
+    seen = {}
+    monkeypatch.setattr(profiling, "enable", lambda json_path=None, pstats_path=None: seen.update(
+        json=json_path, pstats=pstats_path))
+    monkeypatch.setenv(profiling.ENV_VAR, value)
+    assert profiling.enable_from_env() is (json_path is not None)
+    assert seen == ({"json": json_path, "pstats": pstats_path} if json_path else {})
+
+def test_dump_writes_report(tmp_path):
+    f = profiling.profiled("t.f")(lambda: None)
+    profiling.enable(); f()
+    out = tmp_path / "p.json"; profiling.dump(str(out))
+    assert json.loads(out.read_text())["t.f"]["calls"] == 1
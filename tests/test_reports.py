@@ -0,0 +1,32 @@
+
+import os
+from gradebook_manager.gradebook import Gradebook
+from gradebook_manager.models import Student, Assignment
+from gradebook_manager.reports import export_all_students_csv, export_changed_students
+
+def _gradebook():
+    gb = Gradebook()
+    gb.add_assignment(Assignment("A1", "Quiz 1", max_points=10, weight=1.0))
+    for i in range(3):
+        gb.add_student(Student(f"S{i}", "First", f"Last{i}"))
+        gb.enter_grade(f"S{i}", "A1", 5)
+    return gb
+
+def _final(path):
+    with open(path, encoding="utf-8") as f:
+        return [line for line in f if line.startswith("Final %")][0].strip()
+
+def test_incremental_skips_unchanged(tmp_path):
+    gb = _gradebook(); folder = str(tmp_path / "reports")
+    assert len(export_changed_students(gb, folder)) == 3
+    gb.enter_grade("S1", "A1", 7)
+    assert export_changed_students(gb, folder) == [os.path.join(folder, "S1_report.csv")]
+
+def test_full_export_refreshes_manifest(tmp_path):
+    gb = _gradebook(); folder = str(tmp_path / "reports")
+    export_all_students_csv(gb, folder, incremental=True)
+    gb.enter_grade("S0", "A1", 9)
+    export_all_students_csv(gb, folder)
+    gb.enter_grade("S0", "A1", 5)
+    export_all_students_csv(gb, folder, incremental=True)
+    assert _final(os.path.join(folder, "S0_report.csv")) == "Final %,50.00"
@@ -0,0 +1,49 @@
+
+import random
+from gradebook_manager.models import Student
+from gradebook_manager.search import CACHE_SIZE, SearchIndex, _TokenIndex, _tokens
+
+def test_exact_short_match_beats_cached_completions():
+    idx = SearchIndex()
+    for i in range(2000):
+        idx.add_student(Student(f"S{i:04d}", f"Lisa{i}", f"Lindqvist{i}"))
+    idx.add_student(Student("S9999", "Wei", "Li"))
+    hits = idx.search("li", kind="student", limit=5)
+    assert hits[0].key == "S9999" and hits[0].score == 3.0
+
+def _brute_prefix(ix, term):
+    out = {}
+    for key, toks in ix.doc_tokens.items():
+        lens = [len(t) for t in toks if t.startswith(term)]
+        if lens:
+            n = min(lens); out[key] = 3.0 if n == len(term) else 2.0 + len(term) / n
+    return out
+
+def test_prefix_ranking_matches_brute_force_under_churn():
+    rnd = random.Random(1); ix = _TokenIndex()
+    names = ["li", "lin", "lina", "linus", "lisa", "lindqvist", "liang", "al", "alma", "alvarez"]
+    live = set()
+    for step in range(3000):
+        key = f"K{rnd.randrange(400)}"
+        if key in live and rnd.random() < 0.3:
+            ix.remove(key); live.discard(key)
+        else:
+            first, last = rnd.sample(names, 2)
+            ix.add(key, key, _tokens(key, first, last)); live.add(key)
+    for term in ("l", "li", "lin", "a", "al", "alv"):
+        for limit in (1, 5, CACHE_SIZE // 2, CACHE_SIZE * 2):
+            # the best `limit` scores, with correct per-doc scores; equal scores may tie in any order
+            expected = _brute_prefix(ix, term); got = ix.prefix(term, limit)
+            assert all(expected[k] == s for k, s in got.items())
+            top = sorted(got.values(), reverse=True)[:limit]
+            assert top == sorted(expected.values(), reverse=True)[:limit], (term, limit)
+
+def test_gradebook_index_is_lazy_and_kept_current():
+    from gradebook_manager.gradebook import Gradebook
+    gb = Gradebook(students={"S1": Student("S1", "Amaka", "Okoro")})
+    assert gb._index is None
+    gb.add_student(Student("S2", "Amadi", "Eze"))
+    assert [h.key for h in gb.index.search("ama", kind="student")] == ["S1", "S2"]
+    gb.delete_student("S1"); gb.update_student("S2", first_name="Chidi")
+    assert gb.index.search("ama", kind="student") == []
+    assert [h.key for h in gb.index.search("chidi")] == ["S2"]
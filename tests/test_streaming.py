@@ -0,0 +1,68 @@
+
+import csv, os, random
+import pytest
+from gradebook_manager.gradebook import Gradebook
+from gradebook_manager.models import Student, Assignment, Category
+from gradebook_manager.streaming import external_sort, stream_gradebook
+
+def test_external_sort_is_stable_across_spills(tmp_path):
+    rnd = random.Random(3)
+    rows = [(f"k{rnd.randrange(50):02d}", str(i)) for i in range(5000)]
+    out, spilled = external_sort(iter(rows), str(tmp_path), chunk_rows=97, fan_in=4)
+    got = [(key, payload) for key, _, payload in out]
+    assert got == sorted(rows, key=lambda r: r[0])   # sorted() is stable, like the merge
+    assert spilled > 52   # 52 runs plus the intermediate merge passes
+
+def test_in_memory_sort_when_it_fits(tmp_path):
+    out, spilled = external_sort(iter([("b", "1"), ("a", "2"), ("b", "0")]), str(tmp_path))
+    assert spilled == 0 and [r[2] for r in out] == ["2", "1", "0"]
+
+def test_stream_matches_in_memory_gradebook(tmp_path):
+    rnd = random.Random(5)
+    gb = Gradebook()
+    for j in range(6):
+        gb.add_assignment(Assignment(f"A{j}", f"Item {j}", max_points=20, weight=0.1,
+                                     type="quiz" if j < 4 else "exam"))
+    gb.set_category(Category("quiz", 0.4, drop_lowest=1))
+    students_p = tmp_path / "students.csv"; grades_p = tmp_path / "grades.csv"
+    rows = []
+    with open(students_p, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f); w.writerow(["student_id", "first_name", "last_name", "email"])
+        for i in rnd.sample(range(300), 300):
+            sid = f"S{i:03d}"; w.writerow([sid, "F", f"L{i}", ""])
+            gb.add_student(Student(sid, "F", f"L{i}"))
+            rows += [(sid, f"A{j}", rnd.randint(0, 20)) for j in range(6) if rnd.random() < 0.8]
+    rows += [("S999", "A0", 5), ("S001", "A9", 5), ("S002", "A0", 99)]   # unknown / out of range
+    rnd.shuffle(rows)
+    with open(grades_p, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f); w.writerow(["student_id", "assignment_id", "score"]); w.writerows(rows)
+    for sid, aid, score in rows:
+        if sid in gb.students and aid in gb.assignments and score <= 20:
+            gb.enter_grade(sid, aid, score)
+
+    summary = stream_gradebook(gb, str(students_p), str(grades_p), summary_csv=str(tmp_path / "summary.csv"),
+                               report_dir=str(tmp_path / "reports"), chunk_rows=128, tmpdir=str(tmp_path))
+    assert summary.students == 300 and summary.skipped_rows == 3 and summary.spill_files > 0
+    assert summary.class_average == pytest.approx(gb.class_average())
+    with open(tmp_path / "summary.csv", newline="", encoding="utf-8") as f:
+        streamed = {r["student_id"]: float(r["percentage"]) for r in csv.DictReader(f)}
+    expected = gb.class_percentages()
+    assert streamed.keys() == expected.keys()
+    assert all(streamed[sid] == pytest.approx(expected[sid], abs=0.005) for sid in expected)
+    assert len(os.listdir(tmp_path / "reports")) == 300
+
+def test_stream_invalidates_export_cache(tmp_path):
+    from gradebook_manager.reports import export_changed_students, manifest_path
+    gb = Gradebook()
+    gb.add_assignment(Assignment("A1", "Final", max_points=10, weight=1.0))
+    gb.add_student(Student("S1", "F", "L")); gb.enter_grade("S1", "A1", 8)
+    folder = str(tmp_path / "reports_csv")
+    export_changed_students(gb, folder)
+    students_p = tmp_path / "students.csv"; grades_p = tmp_path / "grades.csv"
+    students_p.write_text("student_id,first_name,last_name,email\nS1,F,L,\n", encoding="utf-8")
+    grades_p.write_text("student_id,assignment_id,score\n", encoding="utf-8")
+    stream_gradebook(gb, str(students_p), str(grades_p), report_dir=folder, tmpdir=str(tmp_path))
+    assert not os.path.exists(manifest_path(folder))
+    assert export_changed_students(gb, folder) == [os.path.join(folder, "S1_report.csv")]
+    with open(os.path.join(folder, "S1_report.csv"), encoding="utf-8") as f:
+        assert "Final %,80.00\n" in f.read()
@@ -0,0 +1,54 @@
+
+import pytest
+from gradebook_manager.exceptions import NotFoundError
+from gradebook_manager.gradebook import Gradebook
+from gradebook_manager.models import Student, Assignment
+from gradebook_manager.transcripts import TranscriptEngine
+
+def _course(scores):
+    gb = Gradebook()
+    gb.add_assignment(Assignment("A1", "Final", max_points=100, weight=1.0))
+    for sid, score in scores.items():
+        gb.add_student(Student(sid, "F", sid)); gb.enter_grade(sid, "A1", score)
+    return gb
+
+def _count_passes(monkeypatch):
+    calls = []
+    orig = Gradebook.class_percentages
+    monkeypatch.setattr(Gradebook, "class_percentages", lambda self, *a: calls.append(self) or orig(self, *a))
+    return calls
+
+def test_gpas_across_terms(tmp_path):
+    cache = str(tmp_path / "transcripts.json")
+    eng = TranscriptEngine(cache_path=cache)
+    eng.add_course("T1", "MTH", _course({"S1": 75, "S2": 55}), credits=3)   # 5.0 / 3.0
+    eng.add_course("T1", "PHY", _course({"S1": 45}), credits=1)             # 2.0
+    eng.close_term("T1")
+    eng.add_course("T2", "CHM", _course({"S1": 62, "S2": 30}), credits=2)   # 4.0 / 0.0
+    assert eng.term_gpa("S1", "T1") == pytest.approx((3 * 5 + 1 * 2) / 4)
+    assert eng.cumulative_gpa("S1") == pytest.approx((3 * 5 + 1 * 2 + 2 * 4) / 6)
+    assert eng.cumulative_gpa("S2") == pytest.approx(3 * 3 / 5)
+    reloaded = TranscriptEngine(cache_path=cache)
+    assert reloaded.term_gpa("S1", "T1") == eng.term_gpa("S1", "T1")
+
+def test_open_terms_recompute_only_on_change(monkeypatch):
+    gb = _course({f"S{i}": 50 + i for i in range(5)})
+    other = _course({"S0": 90})
+    eng = TranscriptEngine()
+    eng.add_course("T1", "MTH", gb, credits=3); eng.add_course("T1", "BIO", other, credits=2)
+    calls = _count_passes(monkeypatch)
+    for i in range(5):
+        eng.cumulative_gpa(f"S{i}"); eng.term_gpa(f"S{i}", "T1")
+    assert len(calls) == 2   # one pass per course, shared by all ten queries
+    gb.enter_grade("S0", "A1", 80)
+    assert eng.term_gpa("S0", "T1") == pytest.approx(5.0)
+    assert len(calls) == 3 and calls[2] is gb   # only the edited course is recomputed
+    gb.gpa_scale = [(0.0, 1.0)]
+    assert eng.term_gpa("S1", "T1") == pytest.approx(1.0)   # scale changes invalidate too
+
+def test_unknown_term_is_an_error():
+    eng = TranscriptEngine()
+    eng.add_course("T1", "MTH", _course({"S1": 75}), credits=3)
+    with pytest.raises(NotFoundError):
+        eng.term_gpa("S1", "T2")
+    assert "T2" not in eng._term_cache